@@ -1,6 +1,11 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 
-from .models import Author, Genre, Book, BookInstance, Language
+from .models import Author, Genre, Book, BookInstance, Language, Task
+from . import taxonomy
+from .autocomplete import AutocompleteSelect
+from .deletion import needs_chunked_delete, start_chunked_delete
+from .forms import BookForm
+from .pagination import CachedCountPaginator
 
 
 #admin.site.register(Book)
@@ -9,6 +14,34 @@ admin.site.register(Genre)
 admin.site.register(Language)
 #admin.site.register(BookInstance)
 
+class ChunkedDeleteAdminMixin:
+    """
+    Deletes objects with many dependents in the background, in chunks.
+    """
+    def delete_model(self, request, obj):
+        if needs_chunked_delete(obj):
+            start_chunked_delete(obj)
+            self.message_user(request, f"{obj} has many dependents and is being deleted in the background.",
+                              messages.WARNING)
+        else:
+            super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        for obj in queryset:
+            self.delete_model(request, obj)
+
+class AutocompleteAdminMixin:
+    """
+    Renders the foreign keys named in autocomplete_widgets (field -> index kind)
+    with the catalog autocomplete widget instead of a full <select>.
+    """
+    autocomplete_widgets = {}
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name in self.autocomplete_widgets:
+            kwargs['widget'] = AutocompleteSelect(self.autocomplete_widgets[db_field.name])
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
 class BooksInstanceInline(admin.TabularInline):
     model = BookInstance
 
@@ -16,19 +49,38 @@ class BooksInline(admin.TabularInline):
     model = Book
 
 @admin.register(Author)
-class AuthorAdmin(admin.ModelAdmin):
+class AuthorAdmin(ChunkedDeleteAdminMixin, admin.ModelAdmin):
+    paginator = CachedCountPaginator
+    show_full_result_count = False
     list_display = ('last_name', 'first_name', 'date_of_birth', 'date_of_death')
     fields = ['first_name', 'last_name', ('date_of_birth', 'date_of_death')]
     inlines = [BooksInline]
 
 @admin.register(Book)
-class BookAdmin(admin.ModelAdmin):
+class BookAdmin(AutocompleteAdminMixin, ChunkedDeleteAdminMixin, admin.ModelAdmin):
+    paginator = CachedCountPaginator
+    show_full_result_count = False
+    autocomplete_widgets = {'author': 'author'}
+    form = BookForm
     list_display = ('title', 'author', 'display_genre')
     inlines = [BooksInstanceInline]
 
+    def get_object(self, request, object_id, from_field=None):
+        obj = super().get_object(request, object_id, from_field)
+        return obj and taxonomy.attach([obj])[0]
+
+    def get_changelist_instance(self, request):
+        # display_genre and the forms read genres from the taxonomy registry.
+        changelist = super().get_changelist_instance(request)
+        taxonomy.attach(changelist.result_list)
+        return changelist
+
 
 @admin.register(BookInstance)
-class BookInstanceAdmin(admin.ModelAdmin):
+class BookInstanceAdmin(AutocompleteAdminMixin, admin.ModelAdmin):
+    paginator = CachedCountPaginator
+    show_full_result_count = False
+    autocomplete_widgets = {'book': 'book'}
     list_display = ('book', 'status', 'borrower', 'due_back', 'id')
 
     fieldsets = (
@@ -40,3 +92,9 @@ class BookInstanceAdmin(admin.ModelAdmin):
         }),
     )
 
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'attempts', 'run_after', 'finished', 'duration')
+    list_filter = ('status', 'name')
+    readonly_fields = ('created', 'started', 'finished', 'duration', 'last_error')
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class CatalogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'catalog'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+        from . import signals
+        from .search import repair_search_tables
+        from .versions import require_shared_cache
+        require_shared_cache()
+        post_migrate.connect(repair_search_tables, sender=self)
@@ -0,0 +1,118 @@
+"""
+Prefix search over book titles and author names for autocomplete widgets.
+
+A book title matches from the start of any of its words, so "rings" finds "The
+Lord of the Rings", and titles that start with the query come first. An author
+matches from the start of "last first" or "first last".
+
+On SQLite a lookup is one or two queries against the FTS5 tables in
+catalog/search.py, which triggers keep up to date, so every process sees a
+change as soon as it is committed and nothing is built in memory. The queries
+carry a LIMIT without an ORDER BY, so SQLite stops at the first matches
+instead of ranking them all. Other databases get ``istartswith`` queries on
+the source tables.
+"""
+from django import forms
+from django.db import connection
+from django.db.models import Q, Value
+from django.db.models.functions import Concat
+from django.urls import reverse
+
+from .models import Author, Book
+from .search import has_search_tables
+
+
+def normalize(text):
+    return ' '.join(text.casefold().split())
+
+
+def book_fallback(prefix, limit):
+    books = Book.objects.filter(Q(title__istartswith=prefix) | Q(title__icontains=f' {prefix}'))
+    return list(books.order_by('title').values_list('pk', 'title')[:limit])
+
+
+def author_fallback(prefix, limit):
+    authors = Author.objects.annotate(
+        last_first=Concat('last_name', Value(' '), 'first_name'),
+        first_last=Concat('first_name', Value(' '), 'last_name'),
+        label=Concat('last_name', Value(', '), 'first_name'),
+    ).filter(Q(last_first__istartswith=prefix) | Q(first_last__istartswith=prefix))
+    return list(authors.order_by('last_name', 'first_name').values_list('pk', 'label')[:limit])
+
+
+class PrefixIndex:
+    def __init__(self, table, label, any_word, fallback):
+        self.table = table
+        # The column holding the label shown for a match.
+        self.label = label
+        # Whether a match may start at any word rather than only at a column's start.
+        self.any_word = any_word
+        self.fallback = fallback
+
+    def search(self, query, limit=20):
+        """
+        Returns up to ``limit`` (pk, label) pairs whose keys start with ``query``.
+        """
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        if not has_search_tables(connection):
+            return self.fallback(prefix, limit)
+        # A quoted phrase whose last word may be cut short; ^ anchors it to the
+        # start of a column.
+        phrase = '"%s" *' % prefix.replace('"', '""')
+        results = {}
+        with connection.cursor() as cursor:
+            for match in ['^ ' + phrase] + ([phrase] if self.any_word else []):
+                if len(results) >= limit:
+                    break
+                cursor.execute(
+                    f'SELECT rowid, {self.label} FROM {self.table} WHERE {self.table} MATCH %s LIMIT %s',
+                    [match, limit],
+                )
+                for pk, label in sorted(cursor.fetchall(), key=lambda row: row[1].casefold()):
+                    results.setdefault(pk, label)
+        return list(results.items())[:limit]
+
+
+indexes = {
+    'book': PrefixIndex('catalog_book_search', 'title', True, book_fallback),
+    'author': PrefixIndex('catalog_author_search', 'label', False, author_fallback),
+}
+
+
+class AutocompleteSelect(forms.Select):
+    """
+    A select that only renders the current choice. The options are filled in
+    from the autocomplete endpoint as the user types, so the form stays the same
+    size however many rows the related table has.
+    """
+    class Media:
+        js = ['js/autocomplete.js']
+
+    def __init__(self, kind, attrs=None):
+        self.kind = kind
+        super().__init__(attrs)
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        attrs['data-autocomplete-url'] = reverse('autocomplete', args=[self.kind])
+        return attrs
+
+    def optgroups(self, name, value, attrs=None):
+        field = self.choices.field
+        selected = {str(v) for v in value if str(v) not in field.empty_values}
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, '', field.empty_label or '', not selected, 0))
+        # Batch formsets look up every row's choice in one query beforehand.
+        lookup = getattr(field, 'lookup', None)
+        if lookup is not None:
+            objs = [lookup[pk] for pk in selected if pk in lookup]
+        else:
+            objs = field.queryset.filter(pk__in=selected)
+        for obj in objs:
+            options.append(self.create_option(
+                name, field.prepare_value(obj), field.label_from_instance(obj), True, len(options),
+            ))
+        return [(None, options, 0)]
@@ -0,0 +1,102 @@
+"""
+Conditional GET and shared-cache headers for the public catalog pages.
+
+Anonymous requests get an ETag and a Last-Modified header worked out from one
+indexed lookup, plus ``Cache-Control: public``, so browsers and proxies can
+revalidate with a 304 instead of having the page rendered again. Signed-in
+users see per-user sidebars, so their responses are marked private and are
+never answered with a 304.
+"""
+from functools import wraps
+
+from django.conf import settings
+from django.db.models import Max
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .models import Author, Book, CatalogEntry, Genre, Language
+from .projection import use_projection
+from .versions import get_version
+
+
+def make_etag(*parts):
+    return '"' + '-'.join(str(part) for part in parts) + '"'
+
+
+def versions(*models):
+    return '.'.join(str(get_version(model)) for model in models)
+
+
+def latest(*timestamps):
+    timestamps = [ts for ts in timestamps if ts is not None]
+    return max(timestamps) if timestamps else None
+
+
+def book_list_validators(request, **kwargs):
+    last_modified = latest(
+        Book.objects.aggregate(latest=Max('updated_at'))['latest'],
+        Author.objects.aggregate(latest=Max('updated_at'))['latest'],
+    )
+    # Catalog entries also show genre and language names, which only their version tracks.
+    models = (Book, Author, CatalogEntry) if use_projection() else (Book, Author)
+    return make_etag('books', versions(*models), last_modified and last_modified.timestamp()), last_modified
+
+
+def author_list_validators(request, **kwargs):
+    last_modified = Author.objects.aggregate(latest=Max('updated_at'))['latest']
+    return make_etag('authors', versions(Author), last_modified and last_modified.timestamp()), last_modified
+
+
+def book_detail_validators(request, pk, **kwargs):
+    row = Book.objects.filter(pk=pk).values_list('updated_at', 'author__updated_at').first()
+    if row is None:
+        return None, None
+    last_modified = latest(*row)
+    # Genre and language names are shown too, but are only tracked by version.
+    return make_etag('book', pk, versions(Genre, Language), last_modified.timestamp()), last_modified
+
+
+def author_detail_validators(request, pk, **kwargs):
+    row = (
+        Author.objects.filter(pk=pk)
+        .annotate(books_updated_at=Max('book__updated_at'))
+        .values_list('updated_at', 'books_updated_at').first()
+    )
+    if row is None:
+        return None, None
+    last_modified = latest(*row)
+    return make_etag('author', pk, last_modified.timestamp()), last_modified
+
+
+def conditional_page(compute):
+    """
+    View decorator answering conditional GETs from anonymous users with a 304
+    when the validators returned by ``compute(request, **kwargs)`` still match.
+    """
+    def validators(request, kwargs):
+        if request.user.is_authenticated:
+            return None, None
+        if not hasattr(request, '_catalog_validators'):
+            request._catalog_validators = compute(request, **kwargs)
+        return request._catalog_validators
+
+    def etag_func(request, *args, **kwargs):
+        return validators(request, kwargs)[0]
+
+    def last_modified_func(request, *args, **kwargs):
+        return validators(request, kwargs)[1]
+
+    def decorator(view_func):
+        conditional_view = condition(etag_func=etag_func, last_modified_func=last_modified_func)(view_func)
+
+        @wraps(view_func)
+        def inner(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if request.user.is_authenticated:
+                patch_cache_control(response, private=True)
+            else:
+                patch_cache_control(response, public=True,
+                                    max_age=getattr(settings, 'CATALOG_PUBLIC_MAX_AGE', 60))
+            return response
+        return inner
+    return decorator
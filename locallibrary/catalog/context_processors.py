@@ -0,0 +1,10 @@
+from django.utils.functional import SimpleLazyObject
+
+from .loans import loan_summary as get_loan_summary
+
+
+def loan_summary(request):
+    """
+    Adds the current user's loan summary, computed only if a template uses it.
+    """
+    return {'loan_summary': SimpleLazyObject(lambda: get_loan_summary(request.user) or {})}
@@ -0,0 +1,117 @@
+"""
+Batched deletion of authors and books with many dependents.
+
+A plain ``delete()`` nulls every dependent row in one UPDATE inside one
+transaction, which holds the SQLite write lock for as long as that takes. Here
+the dependents are detached in bounded chunks, each in its own short
+transaction with a pause in between, before the object itself is deleted.
+Progress is recorded on the deletion's Task row, where the delete views can
+read it whichever process runs the deletion.
+"""
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Author, Book, BookInstance, Task
+from .projection import refresh_entries
+from .versions import bump_version
+
+STATES = {Task.QUEUED: 'queued', Task.RUNNING: 'running', Task.DONE: 'done', Task.FAILED: 'failed'}
+
+
+def dependent_querysets(obj):
+    """
+    (queryset, action) pairs for the rows that deleting obj would touch.
+    """
+    if isinstance(obj, Author):
+        # update() skips auto_now; the books' pages change, so stamp them too.
+        return [(Book.objects.filter(author=obj), {'author': None, 'updated_at': timezone.now()})]
+    if isinstance(obj, Book):
+        return [
+            (BookInstance.objects.filter(book=obj), {'book': None}),
+            (Book.genre.through.objects.filter(book=obj), None),
+        ]
+    raise TypeError(f"Chunked deletion is not supported for {type(obj).__name__}")
+
+
+def dependent_count(obj):
+    return sum(queryset.count() for queryset, _ in dependent_querysets(obj))
+
+
+def needs_chunked_delete(obj):
+    threshold = getattr(settings, 'CATALOG_CHUNKED_DELETE_THRESHOLD', 1000)
+    return dependent_count(obj) > threshold
+
+
+def deletion_key(model_name, pk):
+    return f'delete:catalog.{model_name}:{pk}'
+
+
+def get_progress(model_name, pk):
+    """
+    Returns the state, done and total counts of the queued deletion of an
+    object, or None if it was never queued.
+    """
+    task = Task.objects.filter(idempotency_key=deletion_key(model_name, pk)).values('status', 'progress').first()
+    if task is None:
+        return None
+    return {'done': 0, 'total': 0, **task['progress'], 'state': STATES[task['status']]}
+
+
+def set_progress(obj, **progress):
+    Task.objects.filter(idempotency_key=deletion_key(obj._meta.model_name, obj.pk)).update(progress=progress)
+
+
+def chunked_delete(obj, chunk_size=None, pause=None):
+    """
+    Detaches obj's dependents chunk by chunk, then deletes obj. Returns the
+    number of dependent rows processed.
+    """
+    chunk_size = chunk_size or getattr(settings, 'CATALOG_DELETE_CHUNK_SIZE', 500)
+    pause = getattr(settings, 'CATALOG_DELETE_CHUNK_PAUSE', 0.05) if pause is None else pause
+
+    total = dependent_count(obj)
+    done = 0
+    set_progress(obj, done=done, total=total)
+    for queryset, values in dependent_querysets(obj):
+        while True:
+            with transaction.atomic():
+                ids = list(queryset.values_list('pk', flat=True)[:chunk_size])
+                if not ids:
+                    break
+                chunk = queryset.model.objects.filter(pk__in=ids)
+                if values is None:
+                    chunk.delete()
+                else:
+                    chunk.update(**values)
+            # update() skips the model signals, so invalidate by hand.
+            bump_version(queryset.model)
+            if queryset.model is Book:
+                refresh_entries(ids)
+            done += len(ids)
+            set_progress(obj, done=done, total=max(total, done))
+            if pause:
+                time.sleep(pause)
+
+    obj.delete()
+    return done
+
+
+def start_chunked_delete(obj):
+    """
+    Queues obj for chunked deletion in the background worker.
+    """
+    from .tasks import enqueue
+
+    task = enqueue(
+        'catalog.chunked_delete',
+        {'model': obj._meta.model_name, 'pk': obj.pk},
+        idempotency_key=deletion_key(obj._meta.model_name, obj.pk),
+        # Deleting again is harmless, and a failed deletion must be retryable.
+        retry=True,
+    )
+    # Show the total on the progress page until the worker starts counting.
+    Task.objects.filter(pk=task.pk, status=Task.QUEUED).update(progress={'done': 0, 'total': dependent_count(obj)})
+    return task
@@ -0,0 +1,258 @@
+"""
+Create, update and delete views for librarians, plus the helper endpoints their
+forms use. They are imported on the first request to one of their URLs (see
+``lazy_view`` in urls.py), so the public pages do not pay for loading them and
+their forms when a worker starts.
+"""
+from django.shortcuts import render
+from django.views import generic
+
+from .models import Author, BookInstance
+
+class AuthorUpdateView(generic.UpdateView):
+    model = Author
+
+from django.contrib.auth.decorators import permission_required
+
+from django.shortcuts import get_object_or_404
+from django.http import HttpResponseRedirect
+from django.urls import reverse
+import datetime
+
+from .forms import RenewBookForm, BookForm
+from . import taxonomy
+from .tasks import enqueue
+
+@permission_required('catalog.can_mark_returned')
+def renew_book_librarian(request, pk):
+    """
+    View function for renewing a specific BookInstance by librarian
+    """
+    book_inst = get_object_or_404(BookInstance, pk=pk)
+
+    # If this is a POST request then process the Form data
+    if request.method == 'POST':
+
+        # Create a form instance and populate it with data from the request (binding):
+        form = RenewBookForm(request.POST)
+
+        # Check if the form is valid:
+        if form.is_valid():
+            # process the data in form.cleaned_data as required (here we just write it to the model due_back field)
+            book_inst.due_back = form.cleaned_data['renewal_date']
+            book_inst.save()
+            enqueue('catalog.notify_renewal', {'bookinstance': str(book_inst.pk)},
+                    idempotency_key=f'renewal:{book_inst.pk}:{book_inst.due_back}')
+
+            # redirect to a new URL:
+            return HttpResponseRedirect(reverse('all-borrowed') )
+
+    # If this is a GET (or any other method) create the default form.
+    else:
+        proposed_renewal_date = datetime.date.today() + datetime.timedelta(weeks=3)
+        form = RenewBookForm(initial={'renewal_date': proposed_renewal_date,})
+
+    return render(request, 'catalog/book_renew_librarian.html', {'form': form, 'bookinst':book_inst})
+
+from django.views.generic.edit import CreateView, UpdateView, DeleteView
+from django.urls import reverse_lazy
+from .deletion import get_progress, needs_chunked_delete, start_chunked_delete
+from .models import Author
+from .models import Book
+
+class AuthorCreate(CreateView):
+    model = Author
+    fields = '__all__'
+    initial={'date_of_death':'12/10/2016',}
+
+class AuthorUpdate(UpdateView):
+    model = Author
+    fields = ['first_name','last_name','date_of_birth','date_of_death']
+
+class ChunkedDeleteMixin:
+    """
+    Hands objects with many dependents to the background worker, which deletes
+    them in chunks, and shows the deletion progress page instead.
+    """
+    def form_valid(self, form):
+        if needs_chunked_delete(self.object):
+            start_chunked_delete(self.object)
+            return HttpResponseRedirect(
+                reverse('deletion-progress', args=[self.object._meta.model_name, self.object.pk])
+            )
+        return super().form_valid(form)
+
+class AuthorDelete(ChunkedDeleteMixin, DeleteView):
+    model = Author
+    success_url = reverse_lazy('authors')
+
+
+class BookCreate(CreateView):
+    model = Book
+    form_class = BookForm
+
+
+class BookUpdate(UpdateView):
+    model = Book
+    form_class = BookForm
+
+    def get_object(self, queryset=None):
+        return taxonomy.attach([super().get_object(queryset)])[0]
+
+class BookDelete(ChunkedDeleteMixin, DeleteView):
+    model = Book
+    success_url = reverse_lazy('books')
+
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import FileResponse, Http404
+from . import profiling
+
+@staff_member_required
+def profile_list(request):
+    """
+    Lists recent request profiles and links that trigger new ones.
+    """
+    return render(request, 'catalog/profile_list.html', {
+        'profiles': profiling.recent_profiles(),
+        'profile_param': profiling.PROFILE_PARAM,
+        'tokens': {mode: profiling.make_token(request.user, mode) for mode in profiling.MODES},
+    })
+
+@staff_member_required
+def profile_download(request, name):
+    path = profiling.profile_path(name)
+    if path is None:
+        raise Http404('No such profile')
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=name)
+
+def deletion_progress(request, model, pk):
+    """
+    Shows how far a background chunked deletion has got.
+    """
+    if model not in ('author', 'book'):
+        raise Http404('No such deletion')
+    progress = get_progress(model, pk)
+    if progress is None:
+        raise Http404('No such deletion')
+    success_url = reverse('authors' if model == 'author' else 'books')
+    return render(request, 'catalog/deletion_progress.html',
+                  {'model': model, 'progress': progress, 'success_url': success_url})
+
+from django.http import JsonResponse
+from .autocomplete import indexes as autocomplete_indexes
+
+def autocomplete(request, kind):
+    """
+    JSON prefix search used by the autocomplete widgets: ?q=<prefix>.
+    """
+    index = autocomplete_indexes.get(kind)
+    if index is None:
+        raise Http404('No such autocomplete')
+    try:
+        limit = max(1, min(int(request.GET.get('limit', 20)), 50))
+    except ValueError:
+        limit = 20
+    results = index.search(request.GET.get('q', ''), limit=limit)
+    return JsonResponse({'results': [{'id': pk, 'text': label} for pk, label in results]})
+
+from django.contrib.auth.mixins import PermissionRequiredMixin
+from django.core.exceptions import ValidationError
+from .forms import AuthorBatchForm, BookBatchForm, BookInstanceBatchForm, batch_formset
+from .signals import TRACKED_FIELDS, bulk_saved, remember_previous
+
+class BatchEditView(PermissionRequiredMixin, generic.FormView):
+    """
+    Creates and updates many objects from one page of rows. ``?ids=1,2,3``
+    loads existing objects for editing and ``?rows=N`` sets how many blank
+    rows follow them.
+    """
+    template_name = 'catalog/batch_form.html'
+    form_class = None
+    max_rows = 200
+
+    @property
+    def model(self):
+        return self.form_class._meta.model
+
+    def get_permission_required(self):
+        opts = self.model._meta
+        return [f'{opts.app_label}.add_{opts.model_name}', f'{opts.app_label}.change_{opts.model_name}']
+
+    def get_ids(self):
+        pk_field = self.model._meta.pk
+        ids = []
+        for value in self.request.GET.get('ids', '').split(',')[:self.max_rows]:
+            try:
+                ids.append(pk_field.to_python(value.strip()))
+            except ValidationError:
+                continue
+        return [pk for pk in ids if pk is not None]
+
+    def get_queryset(self):
+        related = [field.name for field in self.model._meta.many_to_many]
+        return self.model._default_manager.filter(pk__in=self.get_ids()).prefetch_related(*related).order_by('pk')
+
+    def get_form_class(self):
+        try:
+            extra = max(0, min(int(self.request.GET.get('rows', 10)), self.max_rows))
+        except ValueError:
+            extra = 10
+        return batch_formset(self.form_class, extra=extra, max_rows=self.max_rows)
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        # Formset initial data is a list of rows, not FormView's dict.
+        del kwargs['initial']
+        kwargs['queryset'] = self.get_queryset()
+        return kwargs
+
+    def get_context_data(self, **kwargs):
+        kwargs.setdefault('title', f'Add or edit {self.model._meta.verbose_name_plural}')
+        return super().get_context_data(**kwargs)
+
+    def form_valid(self, form):
+        if self.model in TRACKED_FIELDS:
+            remember_previous(self.model, [row.instance for row in form.forms if row.has_changed()])
+        created, updated = form.save_bulk()
+        bulk_saved(self.model, created + updated)
+        ids = ','.join(str(obj.pk) for obj in created + updated) or self.request.GET.get('ids', '')
+        return HttpResponseRedirect(f'{self.request.path}?ids={ids}&rows=0')
+
+class AuthorBatch(BatchEditView):
+    form_class = AuthorBatchForm
+
+class BookBatch(BatchEditView):
+    form_class = BookBatchForm
+
+class BookInstanceBatch(BatchEditView):
+    form_class = BookInstanceBatchForm
+
+from django.core.exceptions import ImproperlyConfigured
+from . import forecast
+
+@staff_member_required
+def availability_forecast(request):
+    """
+    Lists the books expected to run out of available copies within the next
+    ?days=N days (30 by default).
+    """
+    try:
+        days = max(1, min(int(request.GET.get('days', forecast.DEFAULT_HORIZON_DAYS)), 365))
+    except ValueError:
+        days = forecast.DEFAULT_HORIZON_DAYS
+    today = datetime.date.today()
+    try:
+        report = forecast.shortage_report(days, today)
+    except ImproperlyConfigured as e:
+        return render(request, 'catalog/availability_forecast.html', {'days': days, 'error': e}, status=503)
+    books = Book.objects.select_related('author').in_bulk([book_id for book_id, *_ in report['rows']])
+    rows = [(books.get(book_id), *numbers) for book_id, *numbers in report['rows']]
+    return render(request, 'catalog/availability_forecast.html', {
+        'days': days,
+        'end': today + datetime.timedelta(days=days),
+        'computed': report['computed'],
+        'total': report['total'],
+        'short': report['short'],
+        'rows': rows,
+    })
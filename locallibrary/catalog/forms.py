@@ -2,6 +2,7 @@ from django import forms
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 import datetime
+import functools
 
 
 class RenewBookForm(forms.Form):
@@ -18,4 +19,239 @@ class RenewBookForm(forms.Form):
         if data > datetime.date.today() + datetime.timedelta(weeks=4):
             raise ValidationError(_('Invalid date - renewal more than 4 weeks ahead'))
 
-        return data
\ No newline at end of file
+        return data
+
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from . import taxonomy
+from .autocomplete import AutocompleteSelect
+from .models import Author, Book, BookInstance
+
+
+class PrefetchedModelChoiceField(forms.ModelChoiceField):
+    """
+    A ModelChoiceField that reads its object from ``lookup`` (filled in from the
+    taxonomy registry, or by BatchModelFormSet with one query for every row)
+    instead of querying per form.
+    """
+    lookup = None
+
+    def to_python(self, value):
+        if self.lookup is None or value in self.empty_values:
+            return super().to_python(value)
+        if isinstance(value, self.queryset.model):
+            return value
+        try:
+            return self.lookup[str(value)]
+        except KeyError:
+            raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice',
+                                  params={'value': value})
+
+
+class PrefetchedModelMultipleChoiceField(forms.ModelMultipleChoiceField):
+    """
+    The many-to-many counterpart of PrefetchedModelChoiceField. Cleans to a list
+    of objects rather than a queryset.
+    """
+    lookup = None
+
+    def clean(self, value):
+        if self.lookup is None:
+            return super().clean(value)
+        value = self.prepare_value(value)
+        if not value:
+            if self.required:
+                raise ValidationError(self.error_messages['required'], code='required')
+            return []
+        if not isinstance(value, (list, tuple)):
+            raise ValidationError(self.error_messages['invalid_list'], code='invalid_list')
+        objs = []
+        for pk in value:
+            try:
+                objs.append(self.lookup[str(pk)])
+            except KeyError:
+                raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice',
+                                      params={'value': pk})
+        self.run_validators(value)
+        return objs
+
+
+class PrefetchedModelForm(forms.ModelForm):
+    """
+    A ModelForm whose Prefetched fields over genres or languages are listed and
+    validated from the taxonomy registry. Related objects found in a lookup have
+    already been checked, so model validation skips its existence query for them.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for field in self.fields.values():
+            if isinstance(field, (PrefetchedModelChoiceField, PrefetchedModelMultipleChoiceField)):
+                registry = taxonomy.registries.get(field.queryset.model)
+                if registry:
+                    field.lookup = registry.refresh().lookup
+                    empty = [] if field.empty_label is None else [('', field.empty_label)]
+                    field.choices = empty + [(obj.pk, str(obj)) for obj in registry.objects]
+
+    def _get_validation_exclusions(self):
+        exclude = super()._get_validation_exclusions()
+        exclude.update(
+            name for name, field in self.fields.items()
+            if isinstance(field, PrefetchedModelChoiceField) and field.lookup is not None
+        )
+        return exclude
+
+
+class BookForm(PrefetchedModelForm):
+    class Meta:
+        model = Book
+        fields = '__all__'
+        field_classes = {
+            'language': PrefetchedModelChoiceField,
+            'genre': PrefetchedModelMultipleChoiceField,
+        }
+        widgets = {
+            'author': AutocompleteSelect('author'),
+        }
+
+
+class BatchModelFormSet(forms.BaseModelFormSet):
+    """
+    A model formset for creating and updating many rows at once.
+
+    Related objects for every row are looked up with one query per field, choice
+    lists are built once and shared by every row, and ``save_bulk()`` writes the
+    rows with bulk_create() and bulk_update() in one transaction.
+    """
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        pk_name = self.model._meta.pk.name
+        field = form.fields.get(pk_name)
+        if type(field) is forms.ModelChoiceField:
+            form.fields[pk_name] = PrefetchedModelChoiceField(
+                field.queryset, initial=field.initial, required=False, widget=field.widget,
+            )
+
+    @cached_property
+    def forms(self):
+        rows = [self._construct_form(i, **self.get_form_kwargs(i)) for i in range(self.total_form_count())]
+        self.share_lookups(rows)
+        return rows
+
+    def share_lookups(self, rows):
+        if not rows:
+            return
+        for name, field in rows[0].fields.items():
+            if isinstance(field, (PrefetchedModelChoiceField, PrefetchedModelMultipleChoiceField)) and field.lookup is None:
+                lookup = self.lookup_objects(field, rows, name)
+                for form in rows:
+                    form.fields[name].lookup = lookup
+            if isinstance(field, forms.ModelChoiceField) and type(field.widget) in (forms.Select, forms.SelectMultiple):
+                # Fetched once, and only if the rows are rendered.
+                choices = functools.cache(lambda choices=field.choices: list(choices))
+                for form in rows:
+                    form.fields[name].widget.choices = choices
+
+    def lookup_objects(self, field, rows, name):
+        if name == self.model._meta.pk.name:
+            # The rows being edited are already loaded.
+            return {str(obj.pk): obj for obj in self.get_queryset()}
+        pk_field = field.queryset.model._meta.pk
+        pks = set()
+        for form in rows:
+            value = form[name].value()
+            for pk in value if isinstance(value, (list, tuple)) else [value]:
+                if pk in field.empty_values:
+                    continue
+                try:
+                    pks.add(pk_field.to_python(pk))
+                except ValidationError:
+                    pass
+        if not pks:
+            return {}
+        return {str(pk): obj for pk, obj in field.queryset.in_bulk(pks).items()}
+
+    def save_bulk(self):
+        """
+        Saves the new and changed rows and returns them as (created, updated).
+        """
+        opts = self.model._meta
+        m2m_names = {field.name for field in opts.many_to_many}
+        concrete_names = {field.name for field in opts.concrete_fields if not field.primary_key}
+        created, updated = [], []
+        update_fields = set()
+        m2m = {}
+        for form in self.forms:
+            if not form.has_changed():
+                continue
+            if form.instance._state.adding:
+                created.append(form.instance)
+                changed = [name for name in form.fields if name in m2m_names]
+            else:
+                updated.append(form.instance)
+                changed = form.changed_data
+                update_fields.update(name for name in changed if name in concrete_names)
+            for name in changed:
+                if name in m2m_names:
+                    m2m.setdefault(name, []).append((form.instance, form.cleaned_data[name]))
+
+        # bulk_update() skips auto_now, so stamp those fields here.
+        now = timezone.now()
+        for field in opts.concrete_fields:
+            if getattr(field, 'auto_now', False) and updated:
+                update_fields.add(field.name)
+                for obj in updated:
+                    setattr(obj, field.attname, now)
+
+        with transaction.atomic():
+            self.model._default_manager.bulk_create(created)
+            if updated and update_fields:
+                self.model._default_manager.bulk_update(updated, sorted(update_fields))
+            for name, rows in m2m.items():
+                relation = getattr(self.model, name)
+                through = relation.through
+                source = relation.field.m2m_field_name() + '_id'
+                target = relation.field.m2m_reverse_field_name() + '_id'
+                through.objects.filter(**{source + '__in': [obj.pk for obj, _ in rows]}).delete()
+                through.objects.bulk_create([
+                    through(**{source: obj.pk, target: related.pk}) for obj, objs in rows for related in objs
+                ])
+        return created, updated
+
+
+class AuthorBatchForm(PrefetchedModelForm):
+    class Meta:
+        model = Author
+        fields = ['first_name', 'last_name', 'date_of_birth', 'date_of_death']
+
+
+class BookBatchForm(PrefetchedModelForm):
+    class Meta:
+        model = Book
+        fields = ['title', 'author', 'summary', 'isbn', 'language', 'genre']
+        field_classes = {
+            'author': PrefetchedModelChoiceField,
+            'language': PrefetchedModelChoiceField,
+            'genre': PrefetchedModelMultipleChoiceField,
+        }
+        widgets = {
+            'author': AutocompleteSelect('author'),
+            'summary': forms.Textarea(attrs={'rows': 2, 'cols': 30}),
+        }
+
+
+class BookInstanceBatchForm(PrefetchedModelForm):
+    class Meta:
+        model = BookInstance
+        fields = ['book', 'imprint', 'status', 'due_back']
+        field_classes = {'book': PrefetchedModelChoiceField}
+        widgets = {'book': AutocompleteSelect('book')}
+
+
+def batch_formset(form, extra=10, max_rows=200):
+    return forms.modelformset_factory(
+        form._meta.model, form=form, formset=BatchModelFormSet,
+        extra=extra, max_num=max_rows, absolute_max=max_rows, validate_max=True,
+    )
@@ -0,0 +1,528 @@
+"""
+In-process load generator for the catalog.
+
+Virtual users replay a weighted mix of scenarios (anonymous browsing, a reader
+checking "my books", a librarian renewing loans) against the WSGI application,
+the ASGI application or a running server, and the results are summarised as a
+JSON-serialisable report. Scenarios are generators that yield ``Request``
+objects and receive ``Response`` objects, so the same traffic can be driven by
+threads or by asyncio. A request can carry a check that fails it even when the
+status looks fine; a scenario that raises is abandoned and the exception type
+is counted in the report.
+"""
+import asyncio
+import datetime
+import http.client
+import io
+import math
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+
+from django.contrib.auth.models import Permission, User
+from django.db import connections
+from django.urls import reverse
+
+from .loans import invalidate_loan_summary
+from .models import Author, Book, BookInstance, Genre, Language
+from .projection import refresh_entries
+from .versions import bump_version
+from .views import BookListView
+
+READER_USERNAME = 'loadtest_reader'
+LIBRARIAN_USERNAME = 'loadtest_librarian'
+DEFAULT_PASSWORD = 'QWEasd123!'
+
+CSRF_INPUT_RE = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+class LoginFailed(Exception):
+    pass
+
+
+class Request:
+    def __init__(self, method, path, route, data=None, check=None):
+        self.method = method
+        self.path = path
+        self.route = route
+        self.data = data
+        # Called with (response, user) once the cookies are stored; raises to
+        # fail the request.
+        self.check = check
+
+    def body(self):
+        return urlencode(self.data).encode() if self.data is not None else b''
+
+
+class Response:
+    def __init__(self, status, headers, content):
+        self.status = status
+        self.headers = headers
+        self.content = content
+
+    @property
+    def ok(self):
+        return self.status < 400
+
+    def csrf_token(self):
+        match = CSRF_INPUT_RE.search(self.content.decode('utf-8', 'replace'))
+        return match.group(1) if match else ''
+
+
+class TrafficPlan:
+    """
+    The ids the scenarios pick from, sampled from the database once per run.
+    """
+    def __init__(self, book_ids, author_ids, loan_ids, book_pages=1, password=DEFAULT_PASSWORD):
+        self.book_ids = book_ids
+        self.book_pages = book_pages
+        self.author_ids = author_ids
+        self.loan_ids = loan_ids
+        self.password = password
+
+    @classmethod
+    def from_database(cls, sample=1000, password=DEFAULT_PASSWORD):
+        return cls(
+            book_ids=list(Book.objects.values_list('pk', flat=True)[:sample]),
+            author_ids=list(Author.objects.values_list('pk', flat=True)[:sample]),
+            loan_ids=[str(pk) for pk in BookInstance.objects.filter(status__exact='o').values_list('pk', flat=True)[:sample]],
+            book_pages=max(1, math.ceil(Book.objects.count() / BookListView.paginate_by)),
+            password=password,
+        )
+
+
+def check_logged_in(response, user):
+    # A rejected login re-renders the form with a 200.
+    if response.status != 302 or 'sessionid' not in user.cookies:
+        raise LoginFailed(f'Login answered {response.status} without a session cookie')
+
+
+def login(user, username, password):
+    if 'sessionid' in user.cookies:
+        return
+    path = reverse('login')
+    response = yield Request('GET', path, 'login')
+    yield Request('POST', path, 'login', {
+        'username': username,
+        'password': password,
+        'csrfmiddlewaretoken': response.csrf_token(),
+    }, check=check_logged_in)
+
+
+def browse(user, plan, rng):
+    yield Request('GET', reverse('index'), 'index')
+    yield Request('GET', reverse('books') + f'?page={rng.randint(1, plan.book_pages)}', 'books')
+    if plan.book_ids:
+        yield Request('GET', reverse('book-detail', args=[rng.choice(plan.book_ids)]), 'book-detail')
+    yield Request('GET', reverse('authors'), 'authors')
+    if plan.author_ids:
+        yield Request('GET', reverse('author-detail', args=[rng.choice(plan.author_ids)]), 'author-detail')
+
+
+def my_books(user, plan, rng):
+    yield from login(user, READER_USERNAME, plan.password)
+    yield Request('GET', reverse('my-borrowed'), 'my-borrowed')
+    yield Request('GET', reverse('index'), 'index')
+
+
+def renew(user, plan, rng):
+    yield from login(user, LIBRARIAN_USERNAME, plan.password)
+    yield Request('GET', reverse('all-borrowed'), 'all-borrowed')
+    if not plan.loan_ids:
+        return
+    path = reverse('renew-book-librarian', args=[rng.choice(plan.loan_ids)])
+    response = yield Request('GET', path, 'renew-book-librarian')
+    renewal_date = datetime.date.today() + datetime.timedelta(weeks=rng.randint(1, 3))
+    yield Request('POST', path, 'renew-book-librarian', {
+        'renewal_date': renewal_date.isoformat(),
+        'csrfmiddlewaretoken': response.csrf_token(),
+    })
+
+
+# Scenario name -> (generator, relative weight, role). Each role keeps its own
+# cookies per virtual user, so logged-in scenarios only log in once.
+SCENARIOS = {
+    'browse': (browse, 70, 'anonymous'),
+    'my_books': (my_books, 20, 'reader'),
+    'renew': (renew, 10, 'librarian'),
+}
+
+
+class VirtualUser:
+    def __init__(self, host):
+        self.host = host
+        self.jars = defaultdict(dict)
+        self.cookies = {}
+
+    def use_role(self, role):
+        self.cookies = self.jars[role]
+
+    def headers(self, request):
+        headers = [('Host', self.host)]
+        if self.cookies:
+            headers.append(('Cookie', '; '.join(f'{k}={v}' for k, v in self.cookies.items())))
+        if request.data is not None:
+            headers.append(('Content-Type', 'application/x-www-form-urlencoded'))
+        return headers
+
+    def store_cookies(self, headers):
+        for name, value in headers:
+            if name.lower() == 'set-cookie':
+                for morsel in SimpleCookie(value).values():
+                    if morsel['max-age'] == '0' or not morsel.value:
+                        self.cookies.pop(morsel.key, None)
+                    else:
+                        self.cookies[morsel.key] = morsel.value
+
+
+class WSGITransport:
+    def __init__(self, application, host):
+        self.application = application
+        self.host = host
+
+    def send(self, request, headers):
+        path, _, query = request.path.partition('?')
+        body = request.body()
+        environ = {
+            'REQUEST_METHOD': request.method,
+            'SCRIPT_NAME': '',
+            'PATH_INFO': path,
+            'QUERY_STRING': query,
+            'SERVER_NAME': self.host,
+            'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'REMOTE_ADDR': '127.0.0.1',
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        for name, value in headers:
+            key = name.upper().replace('-', '_')
+            environ[key if key == 'CONTENT_TYPE' else f'HTTP_{key}'] = value
+
+        started = {}
+
+        def start_response(status, response_headers, exc_info=None):
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = response_headers
+
+        result = self.application(environ, start_response)
+        try:
+            content = b''.join(result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        return Response(started['status'], started['headers'], content)
+
+
+class ASGITransport:
+    def __init__(self, application, host):
+        self.application = application
+        self.host = host
+
+    async def send(self, request, headers):
+        path, _, query = request.path.partition('?')
+        body = request.body()
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': request.method,
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': query.encode(),
+            'root_path': '',
+            'headers': [(name.lower().encode(), value.encode()) for name, value in headers],
+            'client': ('127.0.0.1', 0),
+            'server': (self.host, 80),
+        }
+        messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+        disconnected = asyncio.Event()
+        started = {}
+        chunks = []
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            await disconnected.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                started['status'] = message['status']
+                started['headers'] = [(k.decode(), v.decode()) for k, v in message.get('headers', [])]
+            elif message['type'] == 'http.response.body':
+                chunks.append(message.get('body', b''))
+
+        try:
+            await self.application(scope, receive, send)
+        finally:
+            disconnected.set()
+        return Response(started['status'], started['headers'], b''.join(chunks))
+
+
+class HTTPTransport:
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.netloc = parts.netloc
+        self.prefix = parts.path.rstrip('/')
+        self.local = threading.local()
+
+    def connection(self):
+        if getattr(self.local, 'connection', None) is None:
+            self.local.connection = http.client.HTTPConnection(self.netloc, timeout=30)
+        return self.local.connection
+
+    def send(self, request, headers):
+        connection = self.connection()
+        try:
+            connection.request(request.method, self.prefix + request.path, body=request.body(), headers=dict(headers))
+            response = connection.getresponse()
+            return Response(response.status, response.getheaders(), response.read())
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            self.local.connection = None
+            raise
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = []
+        self.exceptions = Counter()
+
+    def add(self, route, status, latency, failed=False):
+        with self.lock:
+            self.samples.append((route, status, latency, failed or not 0 < status < 400))
+
+    def add_exception(self, exc):
+        with self.lock:
+            self.exceptions[type(exc).__name__] += 1
+
+
+class LoadTest:
+    """
+    Replays SCENARIOS against a transport and reports throughput and latencies.
+
+    The run stops after ``requests`` requests or ``duration`` seconds, whichever
+    comes first. With neither, it stops after 1000 requests.
+    """
+    def __init__(self, transport, plan, concurrency=4, requests=None, duration=None,
+                 seed=0, weights=None, host='localhost'):
+        self.transport = transport
+        self.plan = plan
+        self.concurrency = concurrency
+        self.requests = 1000 if requests is None and duration is None else requests
+        self.duration = duration
+        self.seed = seed
+        self.weights = weights or {name: weight for name, (_, weight, _) in SCENARIOS.items()}
+        self.host = host
+        self.recorder = Recorder()
+        self.issued = 0
+        self.issued_lock = threading.Lock()
+
+    def claim(self):
+        with self.issued_lock:
+            if self.requests is not None and self.issued >= self.requests:
+                return False
+            if self.deadline is not None and time.perf_counter() >= self.deadline:
+                return False
+            self.issued += 1
+            return True
+
+    def pick(self, rng):
+        names = [name for name, weight in self.weights.items() if weight > 0]
+        name = rng.choices(names, weights=[self.weights[n] for n in names])[0]
+        scenario, _, role = SCENARIOS[name]
+        return scenario, role
+
+    def record(self, user, request, send):
+        started = time.perf_counter()
+        try:
+            response = send()
+        except Exception:
+            self.recorder.add(request.route, 0, time.perf_counter() - started)
+            raise
+        return self.check(user, request, response, time.perf_counter() - started)
+
+    def check(self, user, request, response, latency):
+        user.store_cookies(response.headers)
+        try:
+            if request.check is not None:
+                request.check(response, user)
+        except Exception:
+            self.recorder.add(request.route, response.status, latency, failed=True)
+            raise
+        self.recorder.add(request.route, response.status, latency)
+        return response
+
+    def run_user(self, index):
+        rng = random.Random(self.seed + index)
+        user = VirtualUser(self.host)
+        try:
+            while True:
+                scenario, role = self.pick(rng)
+                user.use_role(role)
+                steps = scenario(user, self.plan, rng)
+                response = None
+                try:
+                    while True:
+                        request = steps.send(response)
+                        if not self.claim():
+                            return
+                        response = self.record(
+                            user, request, lambda: self.transport.send(request, user.headers(request))
+                        )
+                except StopIteration:
+                    pass
+                except Exception as exc:
+                    self.recorder.add_exception(exc)
+        finally:
+            connections.close_all()
+
+    async def arun_user(self, index):
+        rng = random.Random(self.seed + index)
+        user = VirtualUser(self.host)
+        while True:
+            scenario, role = self.pick(rng)
+            user.use_role(role)
+            steps = scenario(user, self.plan, rng)
+            response = None
+            try:
+                while True:
+                    request = steps.send(response)
+                    if not self.claim():
+                        return
+                    started = time.perf_counter()
+                    try:
+                        response = await self.transport.send(request, user.headers(request))
+                    except Exception:
+                        self.recorder.add(request.route, 0, time.perf_counter() - started)
+                        raise
+                    response = self.check(user, request, response, time.perf_counter() - started)
+            except StopIteration:
+                pass
+            except Exception as exc:
+                self.recorder.add_exception(exc)
+
+    def run(self):
+        self.start()
+        if isinstance(self.transport, ASGITransport):
+            asyncio.run(self.run_async())
+        else:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                list(pool.map(self.run_user, range(self.concurrency)))
+        return self.report(time.perf_counter() - self.started)
+
+    async def run_async(self):
+        await asyncio.gather(*(self.arun_user(index) for index in range(self.concurrency)))
+
+    def start(self):
+        self.started = time.perf_counter()
+        self.deadline = self.started + self.duration if self.duration else None
+
+    def report(self, elapsed):
+        samples = self.recorder.samples
+        routes = defaultdict(list)
+        statuses = defaultdict(int)
+        for route, status, latency, failed in samples:
+            routes[route].append((failed, latency))
+            statuses[str(status)] += 1
+        errors = sum(1 for *_, failed in samples if failed)
+        return {
+            'mode': type(self.transport).__name__.replace('Transport', '').lower(),
+            'concurrency': self.concurrency,
+            'seed': self.seed,
+            'duration_s': round(elapsed, 3),
+            'requests': len(samples),
+            'errors': errors,
+            'error_rate': round(errors / len(samples), 4) if samples else 0.0,
+            'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else 0.0,
+            'latency_ms': latency_summary([latency for _, _, latency, _ in samples]),
+            'status_codes': dict(statuses),
+            'exceptions': dict(self.recorder.exceptions),
+            'routes': {
+                route: {
+                    'requests': len(route_samples),
+                    'errors': sum(1 for failed, _ in route_samples if failed),
+                    'latency_ms': latency_summary([latency for _, latency in route_samples]),
+                }
+                for route, route_samples in sorted(routes.items())
+            },
+        }
+
+
+def percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    # Nearest-rank percentile.
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def latency_summary(latencies):
+    ordered = sorted(latencies)
+    summary = {name: percentile(ordered, fraction) for name, fraction in
+               (('p50', 0.50), ('p90', 0.90), ('p95', 0.95), ('p99', 0.99))}
+    summary['max'] = ordered[-1] if ordered else 0.0
+    summary['mean'] = sum(ordered) / len(ordered) if ordered else 0.0
+    return {name: round(value * 1000, 3) for name, value in summary.items()}
+
+
+def seed_database(authors=50, books_per_author=5, copies_per_book=4, password=DEFAULT_PASSWORD, seed=0):
+    """
+    Creates load test users and a catalogue of the given size. Users are reset
+    on every call; catalogue rows are added on top of whatever already exists.
+    """
+    rng = random.Random(seed)
+    reader, _ = User.objects.get_or_create(username=READER_USERNAME)
+    reader.set_password(password)
+    reader.save()
+    librarian, _ = User.objects.get_or_create(username=LIBRARIAN_USERNAME)
+    librarian.set_password(password)
+    librarian.save()
+    librarian.user_permissions.add(Permission.objects.get(codename='can_mark_returned'))
+
+    genres = [Genre.objects.get_or_create(name=name)[0] for name in ('Fantasy', 'Science Fiction', 'Poetry', 'History')]
+    language = Language.objects.filter(name__iexact='English').first() or Language.objects.create(name='English')
+
+    new_authors = Author.objects.bulk_create(
+        Author(first_name=f'Load {i}', last_name=f'Author {i}') for i in range(authors)
+    )
+    new_books = Book.objects.bulk_create(
+        Book(title=f'Load test book {a.pk}-{i}', author=a, language=language,
+             summary='Seeded for load testing.', isbn=f'{rng.randrange(10 ** 12, 10 ** 13)}')
+        for a in new_authors for i in range(books_per_author)
+    )
+    Book.genre.through.objects.bulk_create(
+        Book.genre.through(book_id=book.pk, genre_id=rng.choice(genres).pk) for book in new_books
+    )
+    today = datetime.date.today()
+    copies = []
+    for book in new_books:
+        for i in range(copies_per_book):
+            status = rng.choice('oaam')
+            copies.append(BookInstance(
+                book=book, imprint='Load Test Press', status=status,
+                borrower=rng.choice((reader, librarian)) if status == 'o' else None,
+                due_back=today + datetime.timedelta(days=rng.randint(-5, 21)) if status == 'o' else None,
+            ))
+    BookInstance.objects.bulk_create(copies)
+    # bulk_create skips the model signals, so invalidate by hand.
+    for model in (Author, Book, BookInstance, Genre, Language):
+        bump_version(model)
+    invalidate_loan_summary(reader.pk, librarian.pk)
+    refresh_entries(book.pk for book in new_books)
+    return {'authors': len(new_authors), 'books': len(new_books), 'copies': len(copies)}
@@ -0,0 +1,38 @@
+from datetime import date
+
+from django.core.cache import cache
+from django.db.models import Count, Min, Q
+
+from .models import BookInstance
+
+LOAN_SUMMARY_TIMEOUT = 60 * 60
+
+
+def loan_summary_key(user_id, day=None):
+    # The overdue count changes at midnight, so each day gets its own entry.
+    day = day or date.today()
+    return f'catalog:loan-summary:{user_id}:{day.isoformat()}'
+
+
+def loan_summary(user):
+    """
+    Returns the number of books on loan to a user, the next due date and the
+    number of overdue copies. Cached until one of the user's copies changes.
+    """
+    if not user.is_authenticated:
+        return None
+    today = date.today()
+    key = loan_summary_key(user.pk, today)
+    summary = cache.get(key)
+    if summary is None:
+        summary = BookInstance.objects.filter(borrower=user, status__exact='o').aggregate(
+            count=Count('pk'),
+            next_due=Min('due_back'),
+            overdue=Count('pk', filter=Q(due_back__lt=today)),
+        )
+        cache.set(key, summary, LOAN_SUMMARY_TIMEOUT)
+    return summary
+
+
+def invalidate_loan_summary(*user_ids):
+    cache.delete_many([loan_summary_key(user_id) for user_id in user_ids if user_id is not None])
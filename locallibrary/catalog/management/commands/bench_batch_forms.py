@@ -0,0 +1,68 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from catalog.models import Author, Genre, Language
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares creating N books and N authors one form post at a time against "
+        "one batch form post of N rows. Everything is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=50, help='Rows created per run.')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        try:
+            with transaction.atomic():
+                self.run(rows)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, rows):
+        user = User.objects.create_superuser('bench-batch-forms', password=None)
+        client = Client(HTTP_HOST='localhost')
+        client.force_login(user)
+        author = Author.objects.create(first_name='Bench', last_name='Author')
+        language = Language.objects.create(name='Bench language')
+        genre = Genre.objects.create(name='Bench genre')
+
+        def book(i):
+            return {'title': f'Bench {i}', 'author': author.pk, 'summary': 'Bench', 'isbn': '123',
+                    'language': language.pk, 'genre': [genre.pk]}
+
+        def person(i):
+            return {'first_name': f'Bench {i}', 'last_name': 'Writer'}
+
+        self.stdout.write(f"{rows} rows{'':<12}{'ms':>10}{'queries':>10}")
+        for label, single_url, batch_url, row in [
+            ('books', reverse('book_create'), reverse('book-batch'), book),
+            ('authors', reverse('author_create'), reverse('author-batch'), person),
+        ]:
+            single = self.measure(lambda: [client.post(single_url, row(i)) for i in range(rows)])
+            data = {'form-TOTAL_FORMS': rows, 'form-INITIAL_FORMS': 0}
+            for i in range(rows):
+                data.update({f'form-{i}-{name}': value for name, value in row(i).items()})
+            batch = self.measure(lambda: client.post(batch_url, data))
+            self.stdout.write(f"  {label + ' one by one':<20}{single[0] * 1000:>8.1f}{single[1]:>10}")
+            self.stdout.write(f"  {label + ' batch':<20}{batch[0] * 1000:>8.1f}{batch[1]:>10}")
+
+    def measure(self, func):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+        return elapsed, len(queries)
@@ -0,0 +1,50 @@
+import timeit
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.template import Context, Template
+from django.urls import reverse
+
+from catalog.fasturls import fast_url
+
+
+class Command(BaseCommand):
+    help = "Microbenchmark of fast_url() and {% fast_url %} against reverse() and {% url %}."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--number', type=int, default=20000, help='Calls per URL benchmark.')
+        parser.add_argument('--rows', type=int, default=100, help='Rows in the template benchmark.')
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        number, repeat = options['number'], options['repeat']
+        copy_id = uuid.uuid4()
+
+        cases = [
+            ('book-detail', 42),
+            ('author-detail', 42),
+            ('renew-book-librarian', copy_id),
+        ]
+        self.stdout.write(f"{'route':<24}{'reverse() us':>14}{'fast_url() us':>15}{'speedup':>9}")
+        for name, arg in cases:
+            assert reverse(name, args=[arg]) == fast_url(name, arg)
+            slow = self.best(lambda: reverse(name, args=[arg]), number, repeat)
+            fast = self.best(lambda: fast_url(name, arg), number, repeat)
+            self.stdout.write(f"{name:<24}{slow * 1e6:>14.2f}{fast * 1e6:>15.2f}{slow / fast:>8.1f}x")
+
+        rows = list(range(1, options['rows'] + 1))
+        url_template = Template("{% for pk in rows %}<a href=\"{% url 'book-detail' pk %}\"></a>{% endfor %}")
+        fast_template = Template(
+            "{% load catalog_urls %}{% for pk in rows %}<a href=\"{% fast_url 'book-detail' pk %}\"></a>{% endfor %}"
+        )
+        context = Context({'rows': rows})
+        template_number = max(1, number // len(rows))
+        slow = self.best(lambda: url_template.render(context), template_number, repeat)
+        fast = self.best(lambda: fast_template.render(context), template_number, repeat)
+        self.stdout.write(
+            f"{len(rows)}-row template: {{% url %}} {slow * 1e3:.3f} ms, "
+            f"{{% fast_url %}} {fast * 1e3:.3f} ms ({slow / fast:.1f}x)"
+        )
+
+    def best(self, func, number, repeat):
+        return min(timeit.repeat(func, number=number, repeat=repeat)) / number
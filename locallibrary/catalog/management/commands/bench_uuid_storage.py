@@ -0,0 +1,71 @@
+import sqlite3
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from catalog.fields import uuid7
+
+# (label, column type, id generator, id encoder)
+LAYOUTS = [
+    ('hex text + uuid4 (before)', 'char(32)', uuid.uuid4, lambda value: value.hex),
+    ('blob + uuid4', 'blob', uuid.uuid4, lambda value: value.bytes),
+    ('blob + uuid7 (after)', 'blob', uuid7, lambda value: value.bytes),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares insert rate and table/index size of BookInstance-shaped SQLite "
+        "tables keyed by hex-text uuid4 ids and by 16-byte uuid7 ids."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200000)
+        parser.add_argument('--batch', type=int, default=5000, help='Rows per insert transaction.')
+
+    def handle(self, *args, **options):
+        rows, batch = options['rows'], options['batch']
+        self.stdout.write(f"{'layout':<28}{'rows/s':>10}{'table KiB':>11}{'pk index KiB':>14}{'file KiB':>10}")
+        with tempfile.TemporaryDirectory() as directory:
+            for label, column_type, generate, encode in LAYOUTS:
+                path = Path(directory) / f'{column_type}-{generate.__name__}.sqlite3'
+                rate, sizes = self.run_layout(path, column_type, generate, encode, rows, batch)
+                self.stdout.write(
+                    f"{label:<28}{rate:>10.0f}{sizes['table'] / 1024:>11.0f}"
+                    f"{sizes['pk'] / 1024:>14.0f}{path.stat().st_size / 1024:>10.0f}"
+                )
+
+    def run_layout(self, path, column_type, generate, encode, rows, batch):
+        connection = sqlite3.connect(path)
+        connection.execute(
+            f"CREATE TABLE catalog_bookinstance (id {column_type} NOT NULL PRIMARY KEY, "
+            "imprint varchar(200) NOT NULL, due_back date NULL, status varchar(1) NOT NULL, "
+            "book_id bigint NULL, borrower_id integer NULL)"
+        )
+        connection.execute("CREATE INDEX bookinstance_book_id ON catalog_bookinstance (book_id)")
+
+        started = time.perf_counter()
+        for offset in range(0, rows, batch):
+            with connection:
+                connection.executemany(
+                    "INSERT INTO catalog_bookinstance (id, imprint, status, book_id) VALUES (?, ?, ?, ?)",
+                    [(encode(generate()), 'Imprint', 'a', (offset + i) % 1000)
+                     for i in range(min(batch, rows - offset))],
+                )
+        rate = rows / (time.perf_counter() - started)
+
+        sizes = {'table': 0, 'pk': 0}
+        try:
+            for name, size in connection.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name"):
+                if name == 'catalog_bookinstance':
+                    sizes['table'] = size
+                elif name.startswith('sqlite_autoindex_catalog_bookinstance'):
+                    sizes['pk'] = size
+        except sqlite3.OperationalError:
+            # SQLite built without the dbstat virtual table; only the file size is reported.
+            pass
+        connection.close()
+        return rate, sizes
@@ -0,0 +1,44 @@
+import datetime
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.forecast import DEFAULT_HORIZON_DAYS, DEFAULT_THRESHOLD, forecast
+from catalog.models import Book
+
+
+class Command(BaseCommand):
+    help = "Lists the books expected to have no copy available at the end of a forecast horizon."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=DEFAULT_HORIZON_DAYS, help='Days to forecast ahead.')
+        parser.add_argument('--start', type=datetime.date.fromisoformat, help='First day (YYYY-MM-DD), today by default.')
+        parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                            help='Report books expected to have fewer available copies than this.')
+        parser.add_argument('--limit', type=int, default=50, help='Books to list.')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            result = forecast(options['days'], options['start'])
+        except ImproperlyConfigured as e:
+            raise CommandError(e)
+        elapsed = time.perf_counter() - started
+
+        short = result.shortages(options['threshold'])
+        end = result.start + datetime.timedelta(days=result.horizon)
+        self.stdout.write(
+            f"{int(result.copies.sum())} copies of {len(result.book_ids)} books forecast to {end} "
+            f"in {elapsed:.2f} s; {len(short)} expected below {options['threshold']} available copies."
+        )
+        shown = short[:options['limit']]
+        titles = Book.objects.in_bulk([int(result.book_ids[i]) for i in shown])
+        self.stdout.write(f"  {'book':<8}{'title':<40}{'copies':>7}{'now':>7}{'at end':>8}")
+        for i in shown:
+            book_id = int(result.book_ids[i])
+            title = titles[book_id].title if book_id in titles else ''
+            self.stdout.write(
+                f"  {book_id:<8}{title[:38]:<40}{result.copies[i]:>7}"
+                f"{result.expected[i, 0]:>7.1f}{result.expected[i, -1]:>8.1f}"
+            )
@@ -0,0 +1,87 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.loadtest import (
+    DEFAULT_PASSWORD, SCENARIOS, ASGITransport, HTTPTransport, LoadTest, TrafficPlan,
+    WSGITransport, seed_database,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Replays a weighted mix of catalog traffic against the WSGI or ASGI "
+        "application in-process, or against a running server, and prints a JSON report."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', choices=['wsgi', 'asgi', 'http'], default='wsgi')
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Server to target in http mode.')
+        parser.add_argument('--host', default='localhost', help='Host header sent in wsgi/asgi mode.')
+        parser.add_argument('--concurrency', type=int, default=4, help='Threads (wsgi/http) or tasks (asgi).')
+        parser.add_argument(
+            '--requests', type=int,
+            help='Stop after this many requests (default 1000, or no limit with --duration).',
+        )
+        parser.add_argument('--duration', type=float, help='Stop after this many seconds.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the traffic mix.')
+        parser.add_argument(
+            '--mix', default='',
+            help='Scenario weights, e.g. "browse=70,my_books=20,renew=10".',
+        )
+        parser.add_argument('--password', default=DEFAULT_PASSWORD, help='Password of the load test users.')
+        parser.add_argument(
+            '--seed-database', type=int, metavar='AUTHORS',
+            help='Create load test users and this many authors (5 books, 4 copies each) first.',
+        )
+        parser.add_argument('--output', help='Write the report to this file instead of stdout.')
+
+    def handle(self, *args, **options):
+        weights = self.parse_mix(options['mix'])
+        if options['seed_database']:
+            created = seed_database(authors=options['seed_database'], password=options['password'], seed=options['seed'])
+            self.stderr.write(f"Seeded {created['authors']} authors, {created['books']} books, {created['copies']} copies.")
+
+        if options['mode'] == 'wsgi':
+            from locallibrary.wsgi import application
+            transport = WSGITransport(application, options['host'])
+        elif options['mode'] == 'asgi':
+            from locallibrary.asgi import application
+            transport = ASGITransport(application, options['host'])
+        else:
+            transport = HTTPTransport(options['url'])
+
+        plan = TrafficPlan.from_database(password=options['password'])
+        report = LoadTest(
+            transport, plan,
+            concurrency=options['concurrency'],
+            requests=options['requests'],
+            duration=options['duration'],
+            seed=options['seed'],
+            weights=weights,
+            host=options['host'],
+        ).run()
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(output)
+        else:
+            self.stdout.write(output)
+
+    def parse_mix(self, mix):
+        if not mix:
+            return None
+        weights = {name: 0 for name in SCENARIOS}
+        for item in mix.split(','):
+            name, _, weight = item.partition('=')
+            name = name.strip()
+            if name not in SCENARIOS:
+                raise CommandError(f"Unknown scenario '{name}'. Choose from: {', '.join(SCENARIOS)}.")
+            try:
+                weights[name] = float(weight)
+            except ValueError:
+                raise CommandError(f"Invalid weight for '{name}': {weight!r}.")
+        if not any(weights.values()):
+            raise CommandError('At least one scenario needs a positive weight.')
+        return weights
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from catalog.models import CatalogEntry
+from catalog.projection import REBUILD_CHUNK_SIZE, rebuild
+
+
+class Command(BaseCommand):
+    help = "Rewrites the catalog entry projection used by the book list from the book, author and copy tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=REBUILD_CHUNK_SIZE,
+                            help='Books rewritten per transaction.')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        books = rebuild(chunk_size=options['chunk_size'])
+        self.stdout.write(
+            f"Rebuilt {books} catalog entries in {time.perf_counter() - started:.2f}s "
+            f"({CatalogEntry.objects.count()} in the table)."
+        )
@@ -0,0 +1,69 @@
+import json
+import multiprocessing
+import signal
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+
+from catalog import tasks
+
+
+def run_worker(burst, poll_interval, max_tasks):
+    # Connections inherited over fork must not be shared with the parent.
+    connections.close_all()
+    stopping = multiprocessing.Event()
+    signal.signal(signal.SIGTERM, lambda *args: stopping.set())
+    try:
+        tasks.work(burst=burst, poll_interval=poll_interval, max_tasks=max_tasks, should_stop=stopping.is_set)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Runs queued catalog tasks in a pool of worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help='Number of worker processes.')
+        parser.add_argument('--burst', action='store_true', help='Exit once the queue is empty.')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='Seconds to sleep when idle.')
+        parser.add_argument('--max-tasks', type=int, help='Exit each process after this many tasks.')
+        parser.add_argument('--stats', action='store_true', help='Print per task type metrics and exit.')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.stdout.write(json.dumps(tasks.task_stats(), indent=2))
+            return
+
+        requeued = tasks.requeue_stale()
+        if requeued:
+            self.stderr.write(f"Requeued {requeued} stale task(s).")
+
+        started = timezone.now()
+        worker_args = (options['burst'], options['poll_interval'], options['max_tasks'])
+        if options['processes'] == 1:
+            run_worker(*worker_args)
+        else:
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            workers = [context.Process(target=run_worker, args=worker_args) for _ in range(options['processes'])]
+            for worker in workers:
+                worker.start()
+            # Pass a SIGTERM on so the workers finish their current task and exit.
+            previous = signal.signal(signal.SIGTERM, lambda *args: self.stop(workers))
+            try:
+                for worker in workers:
+                    worker.join()
+            except KeyboardInterrupt:
+                self.stop(workers)
+                for worker in workers:
+                    worker.join()
+            finally:
+                signal.signal(signal.SIGTERM, previous)
+
+        self.stdout.write(json.dumps(tasks.task_stats(since=started), indent=2))
+
+    def stop(self, workers):
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
@@ -0,0 +1,85 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog.startup import package_totals, parse_importtime
+
+CHILD = 'from catalog.startup import main; main()'
+
+
+class Command(BaseCommand):
+    help = (
+        "Starts fresh worker processes and reports time to first response, the "
+        "time each startup phase and app takes, and the most expensive imports."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/catalog/', help='Path requested as the first response.')
+        parser.add_argument('--runs', type=int, default=5, help='Cold starts to take the median of.')
+        parser.add_argument('--top', type=int, default=15, help='Modules and packages to list.')
+        parser.add_argument('--slim', action='store_true', help='Start workers with CATALOG_SLIM_APPS=1.')
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Fail if the median time to first response is over CATALOG_STARTUP_TARGET_MS.',
+        )
+
+    def handle(self, *args, **options):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'locallibrary.settings')}
+        if options['slim']:
+            env['CATALOG_SLIM_APPS'] = '1'
+
+        # Timing runs go without -X importtime, which slows imports down.
+        runs = [self.start(env, options['path'])[0] for _ in range(options['runs'])]
+        report, stderr = self.start(env, options['path'], importtime=True)
+        if report['status'].split()[0] != '200':
+            self.stderr.write(f"First response was {report['status']}, not 200 OK.")
+
+        total = statistics.median(run['time_to_first_response'] for run in runs)
+        phase_names = runs[0]['phases'].keys()
+        phases = {name: statistics.median(run['phases'][name] for run in runs) for name in phase_names}
+
+        self.stdout.write(f"{len(report['installed_apps'])} apps, first response {report['path']} "
+                          f"{report['status']} ({report['bytes']} bytes), median of {len(runs)} cold starts")
+        self.stdout.write(f"  {'launch to first response':<28}{total * 1000:>9.1f} ms")
+        for name, seconds in phases.items():
+            self.stdout.write(f"  {name:<28}{seconds * 1000:>9.1f} ms")
+
+        self.stdout.write("\nPer app (importtime run)")
+        self.stdout.write(f"  {'app':<16}{'import ms':>11}{'models ms':>11}{'ready ms':>10}")
+        for label, timings in report['apps'].items():
+            self.stdout.write(
+                f"  {label:<16}{timings.get('create', 0) * 1000:>11.1f}"
+                f"{timings.get('import_models', 0) * 1000:>11.1f}{timings.get('ready', 0) * 1000:>10.1f}"
+            )
+
+        rows = parse_importtime(stderr)
+        self.stdout.write(f"\nSlowest imports by self time ({len(rows)} modules)")
+        for name, self_us, cumulative_us, _ in sorted(rows, key=lambda row: row[1], reverse=True)[:options['top']]:
+            self.stdout.write(f"  {name:<48}{self_us / 1000:>8.1f} ms{cumulative_us / 1000:>9.1f} ms cumulative")
+        self.stdout.write("\nImport self time by package")
+        for package, self_us in package_totals(rows)[:options['top']]:
+            self.stdout.write(f"  {package:<48}{self_us / 1000:>8.1f} ms")
+        self.stdout.write("\nCatalog modules loaded: " + ', '.join(report['loaded_catalog_modules']))
+
+        target = getattr(settings, 'CATALOG_STARTUP_TARGET_MS', None)
+        if target:
+            verdict = 'within' if total * 1000 <= target else 'OVER'
+            self.stdout.write(f"\nTarget {target} ms: {verdict} ({total * 1000:.0f} ms)")
+            if options['check'] and verdict == 'OVER':
+                raise CommandError(f"Time to first response {total * 1000:.0f} ms is over the {target} ms target.")
+
+    def start(self, env, path, importtime=False):
+        command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', CHILD, path]
+        launched = time.time()
+        result = subprocess.run(command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+        if result.returncode:
+            raise CommandError(f"Worker failed to start:\n{result.stderr[-2000:]}")
+        report = json.loads(result.stdout)
+        report['time_to_first_response'] = report['first_response_at'] - launched
+        return report, result.stderr
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0004_alter_bookinstance_options'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bookinstance',
+            index=models.Index(fields=['borrower', 'status', 'due_back'], name='bookinstance_borrower_idx'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:46
+
+import uuid
+
+import catalog.fields
+from django.db import migrations, models
+
+
+def hex_ids_to_binary(apps, schema_editor):
+    """
+    The SQLite table rebuild copies the old 32 character hex ids into the new
+    blob column unchanged, so rewrite them as 16 raw bytes.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT id FROM catalog_bookinstance WHERE typeof(id) = 'text'")
+        rows = cursor.fetchall()
+        cursor.executemany(
+            "UPDATE catalog_bookinstance SET id = %s WHERE id = %s",
+            [(uuid.UUID(hex_id).bytes, hex_id) for (hex_id,) in rows],
+        )
+
+
+def binary_ids_to_hex(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT id FROM catalog_bookinstance WHERE typeof(id) = 'blob'")
+        rows = cursor.fetchall()
+        cursor.executemany(
+            "UPDATE catalog_bookinstance SET id = %s WHERE id = %s",
+            [(uuid.UUID(bytes=bytes(raw_id)).hex, raw_id) for (raw_id,) in rows],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0006_task'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='bookinstance',
+            name='id',
+            field=catalog.fields.CompactUUIDField(default=catalog.fields.uuid7, help_text='Unique ID for this particular book across whole library', primary_key=True, serialize=False),
+        ),
+        migrations.RunPython(hex_ids_to_binary, binary_ids_to_hex),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0007_bookinstance_compact_uuid'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='Last change to the author or their books'),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='Last change to the book or its copies'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0008_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogEntry',
+            fields=[
+                ('book', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='catalog_entry', serialize=False, to='catalog.book')),
+                ('title', models.CharField(max_length=200)),
+                ('url', models.CharField(max_length=200)),
+                ('author_pk', models.BigIntegerField(blank=True, db_index=True, null=True)),
+                ('author_name', models.CharField(blank=True, max_length=201)),
+                ('author_url', models.CharField(blank=True, max_length=200)),
+                ('language_pk', models.BigIntegerField(blank=True, db_index=True, null=True)),
+                ('language', models.CharField(blank=True, max_length=200)),
+                ('genres', models.CharField(blank=True, help_text="Names of the book's first three genres", max_length=1000)),
+                ('copies', models.PositiveIntegerField(default=0)),
+                ('available', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'catalog entries',
+                'ordering': ['book'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 08:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0009_catalogentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='progress',
+            field=models.JSONField(blank=True, default=dict, help_text='What the task has reported of its progress'),
+        ),
+    ]
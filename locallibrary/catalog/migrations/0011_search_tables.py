@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def install(apps, schema_editor):
+    from catalog.search import install_search_tables
+    install_search_tables(schema_editor.connection.alias)
+
+
+def remove(apps, schema_editor):
+    from catalog.search import remove_search_tables
+    remove_search_tables(schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0010_task_progress'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, remove),
+    ]
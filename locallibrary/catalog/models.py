@@ -1,5 +1,6 @@
 from django.db import models
-from django.urls import reverse 
+from .fasturls import fast_url
+from .fields import CompactUUIDField, uuid7
 
 from django.db.models import UniqueConstraint
 from django.db.models.functions import Lower
@@ -22,7 +23,7 @@ class Language(models.Model):
     name = models.CharField(max_length=200, help_text="Enter the language of the book")
 
     def get_absolute_url(self):
-        return reverse('language-detail', args=[str(self.id)])
+        return fast_url('language-detail', self.id)
             
     def __str__(self):
         return self.name
@@ -47,6 +48,8 @@ class Book(models.Model):
     isbn = models.CharField('ISBN',max_length=13, help_text='13 Character <a href="https://www.isbn-international.org/content/what-isbn">ISBN number</a>')
     genre = models.ManyToManyField(Genre, help_text="Select a genre for this book")
     language = models.ForeignKey('Language', on_delete=models.SET_NULL, null=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True,
+                                      help_text="Last change to the book or its copies")
 
     def __str__(self):
         """
@@ -58,14 +61,13 @@ class Book(models.Model):
         """
         Returns the url to access a particular book instance.
         """
-        return reverse('book-detail', args=[str(self.id)])
+        return fast_url('book-detail', self.id)
     def display_genre(self):
         return ', '.join([ genre.name for genre in self.genre.all()[:3] ])
     
     display_genre.short_description = 'Genre'
 
 
-import uuid 
 from datetime import date
 
 from django.conf import settings
@@ -73,7 +75,7 @@ from django.conf import settings
 
 class BookInstance(models.Model):
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, help_text="Unique ID for this particular book across whole library")
+    id = CompactUUIDField(primary_key=True, default=uuid7, help_text="Unique ID for this particular book across whole library")
     book = models.ForeignKey('Book', on_delete=models.SET_NULL, null=True)
     imprint = models.CharField(max_length=200)
     due_back = models.DateField(null=True, blank=True)
@@ -94,6 +96,10 @@ class BookInstance(models.Model):
         permissions = (
             ("can_mark_returned", "Set book as returned"),
         )
+        indexes = [
+            # Covers the "My Borrowed" lookup and its due_back ordering.
+            models.Index(fields=['borrower', 'status', 'due_back'], name='bookinstance_borrower_idx'),
+        ]
 
 
     def __str__(self):
@@ -111,14 +117,86 @@ class Author(models.Model):
     last_name = models.CharField(max_length=100)
     date_of_birth = models.DateField(null=True, blank=True)
     date_of_death = models.DateField('Died', null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True,
+                                      help_text="Last change to the author or their books")
 
 
     def get_absolute_url(self):
-        return reverse('author-detail', args=[str(self.id)])
+        return fast_url('author-detail', self.id)
 
     def __str__(self):
         """
         String for representing the Model object.
         """
         return f"{self.last_name}, {self.first_name}"
-        
\ No newline at end of file
+        
+
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """
+    Model representing a unit of background work, run by manage.py run_catalog_worker.
+    """
+    QUEUED = 'q'
+    RUNNING = 'r'
+    DONE = 'd'
+    FAILED = 'f'
+    TASK_STATUS = (
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    )
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=1, choices=TASK_STATUS, default=QUEUED)
+    idempotency_key = models.CharField(max_length=200, unique=True, null=True, blank=True,
+                                       help_text="Enqueueing twice with the same key returns the existing task")
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    created = models.DateTimeField(auto_now_add=True)
+    started = models.DateTimeField(null=True, blank=True)
+    finished = models.DateTimeField(null=True, blank=True)
+    duration = models.FloatField(null=True, blank=True, help_text="Seconds spent in the last attempt")
+    last_error = models.TextField(blank=True)
+    progress = models.JSONField(default=dict, blank=True, help_text="What the task has reported of its progress")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='task_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.get_status_display()})"
+
+
+class CatalogEntry(models.Model):
+    """
+    Model representing a read-only, flattened copy of a book and everything its
+    listing shows. Kept up to date from the model signals (see catalog/projection.py),
+    rebuilt in full with manage.py rebuild_catalog_projection.
+    """
+    book = models.OneToOneField(Book, on_delete=models.CASCADE, primary_key=True, related_name='catalog_entry')
+    title = models.CharField(max_length=200)
+    url = models.CharField(max_length=200)
+    author_pk = models.BigIntegerField(null=True, blank=True, db_index=True)
+    author_name = models.CharField(max_length=201, blank=True)
+    author_url = models.CharField(max_length=200, blank=True)
+    language_pk = models.BigIntegerField(null=True, blank=True, db_index=True)
+    language = models.CharField(max_length=200, blank=True)
+    genres = models.CharField(max_length=1000, blank=True, help_text="Names of the book's first three genres")
+    copies = models.PositiveIntegerField(default=0)
+    available = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['book']
+        verbose_name_plural = 'catalog entries'
+
+    def __str__(self):
+        return self.title
+
+    def get_absolute_url(self):
+        return self.url
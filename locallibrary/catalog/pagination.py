@@ -0,0 +1,120 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Paginator
+from django.core.exceptions import EmptyResultSet
+from django.db import DatabaseError, connections, transaction
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+from .versions import get_version
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator that avoids running an exact COUNT(*) on every page request.
+
+    Counts are cached per queryset fingerprint for a short time and dropped as
+    soon as the model changes. Unfiltered querysets over tables bigger than
+    CATALOG_COUNT_ESTIMATE_THRESHOLD use the planner's row estimate instead, in
+    which case ``approximate`` is True and templates render "about N results".
+
+    An estimate can be off either way, so it only numbers the pages it is sure
+    to have: the estimated last page, a page past it, and a page that comes
+    back short or empty are numbered against an exact count instead. The real
+    last pages stay reachable and pages past the real end raise EmptyPage.
+    """
+    approximate = False
+
+    @cached_property
+    def count(self):
+        if not isinstance(self.object_list, QuerySet):
+            return super().count
+
+        key = self.cache_key()
+        if key is None:
+            return super().count
+        cached = cache.get(key)
+        if cached is None:
+            estimate = self.estimate_count()
+            if estimate is not None and estimate >= self.estimate_threshold:
+                cached = (estimate, True)
+            else:
+                cached = (super().count, False)
+            cache.set(key, cached, self.cache_timeout)
+        count, self.approximate = cached
+        return count
+
+    def page(self, number):
+        if self.count and self.approximate:
+            try:
+                valid = self.validate_number(number)
+            except EmptyPage:
+                valid = None
+            if valid is not None and valid < self.num_pages:
+                page = super().page(valid)
+                if len(page) == self.per_page:
+                    return page
+            self.use_exact_count()
+        return super().page(number)
+
+    def use_exact_count(self):
+        """
+        Replaces an estimated count with the exact one, here and in the cache.
+        """
+        count = self.object_list.count()
+        cache.set(self.cache_key(), (count, False), self.cache_timeout)
+        # count and num_pages are cached properties.
+        self.__dict__['count'] = count
+        self.__dict__.pop('num_pages', None)
+        self.approximate = False
+
+    @property
+    def cache_timeout(self):
+        return getattr(settings, 'CATALOG_COUNT_CACHE_TIMEOUT', 30)
+
+    @property
+    def estimate_threshold(self):
+        return getattr(settings, 'CATALOG_COUNT_ESTIMATE_THRESHOLD', 100000)
+
+    def cache_key(self):
+        """
+        Fingerprint of the queryset SQL, scoped to the current model version.
+        """
+        query = self.object_list.query
+        try:
+            sql, params = query.sql_with_params()
+        except EmptyResultSet:
+            return None
+        model = self.object_list.model
+        digest = hashlib.md5(f'{self.object_list.db}:{sql}:{params!r}'.encode()).hexdigest()
+        return f'catalog:count:{model._meta.label_lower}:{get_version(model)}:{digest}'
+
+    def estimate_count(self):
+        """
+        Returns the planner's row estimate for an unfiltered queryset, or None.
+        """
+        query = self.object_list.query
+        if query.where.children or query.distinct or query.is_sliced or query.combinator:
+            return None
+
+        connection = connections[self.object_list.db]
+        table = self.object_list.model._meta.db_table
+        try:
+            with transaction.atomic(using=self.object_list.db), connection.cursor() as cursor:
+                if connection.vendor == 'sqlite':
+                    # sqlite_stat1 only exists once ANALYZE has been run.
+                    cursor.execute("SELECT name FROM sqlite_master WHERE name = 'sqlite_stat1'")
+                    if cursor.fetchone() is None:
+                        return None
+                    cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s", [table])
+                    rows = [int(stat.split()[0]) for (stat,) in cursor.fetchall()]
+                    return max(rows) if rows else None
+                if connection.vendor == 'postgresql':
+                    cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+                    row = cursor.fetchone()
+                    return row[0] if row and row[0] > 0 else None
+        except DatabaseError:
+            return None
+        return None
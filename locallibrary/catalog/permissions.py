@@ -0,0 +1,59 @@
+"""
+Permission checks served from the shared cache.
+
+ModelBackend resolves a user's permissions with joins over auth_permission on
+the first check of every request. CachedModelBackend keeps each user's
+permission sets in the cache instead, so a warm request checks permissions
+without querying. Entries are keyed by the Group and Permission cache versions,
+which change when a group or permission changes, and a user's own entries are
+deleted when their groups, permissions or status change (see catalog/signals.py).
+A revocation only reaches every worker because the cache is shared, so the
+backend refuses to run on a per-process cache.
+
+Each session stores the dotted path of the backend that authenticated it, and
+Django logs out sessions whose backend is no longer in AUTHENTICATION_BACKENDS.
+Switching from ModelBackend to this backend therefore logs everybody out once.
+"""
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+
+from .versions import get_version, require_shared_cache
+
+PERMISSION_CACHE_TIMEOUT = 60 * 60
+KINDS = ('user', 'group')
+
+
+def permission_key(user_id, kind):
+    return f'catalog:perms:{user_id}:{kind}:{get_version(Group)}:{get_version(Permission)}'
+
+
+def invalidate_permissions(*user_ids):
+    cache.delete_many([
+        permission_key(user_id, kind) for user_id in user_ids if user_id is not None for kind in KINDS
+    ])
+
+
+class CachedModelBackend(ModelBackend):
+    def __init__(self):
+        require_shared_cache()
+        super().__init__()
+
+    def cached(self, kind, user_obj, obj, resolve):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return resolve(user_obj, obj)
+        attname = f'_{kind}_perm_cache'
+        if not hasattr(user_obj, attname):
+            key = permission_key(user_obj.pk, kind)
+            perms = cache.get(key)
+            if perms is None:
+                perms = resolve(user_obj, obj)
+                cache.set(key, perms, PERMISSION_CACHE_TIMEOUT)
+            setattr(user_obj, attname, perms)
+        return getattr(user_obj, attname)
+
+    def get_user_permissions(self, user_obj, obj=None):
+        return self.cached('user', user_obj, obj, super().get_user_permissions)
+
+    def get_group_permissions(self, user_obj, obj=None):
+        return self.cached('group', user_obj, obj, super().get_group_permissions)
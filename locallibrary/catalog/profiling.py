@@ -0,0 +1,179 @@
+"""
+On-demand per-request profiling for staff users.
+
+A request is profiled only when it carries a signed token, either in the
+``_profile`` query parameter or in the ``X-Catalog-Profile`` header, and the
+signed-in user is the staff member the token was issued to. Tokens are minted
+on the staff profiles page. Untriggered requests pass straight through.
+"""
+import datetime
+import re
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.core import signing
+
+PROFILE_PARAM = '_profile'
+PROFILE_HEADER = 'HTTP_X_CATALOG_PROFILE'
+PROFILE_SALT = 'catalog.profiling'
+MODES = ('cprofile', 'sample')
+EXTENSIONS = {'cprofile': '.prof', 'sample': '.collapsed'}
+
+
+def profile_dir():
+    return Path(getattr(settings, 'CATALOG_PROFILE_DIR', settings.BASE_DIR / 'profiles'))
+
+
+def make_token(user, mode='cprofile'):
+    return signing.dumps({'uid': user.pk, 'mode': mode}, salt=PROFILE_SALT)
+
+
+def read_token(token, user):
+    """
+    Returns the profiling mode a token asks for, or None if it is not valid for the user.
+    """
+    max_age = getattr(settings, 'CATALOG_PROFILE_TOKEN_MAX_AGE', 60 * 60)
+    try:
+        payload = signing.loads(token, salt=PROFILE_SALT, max_age=max_age)
+    except signing.BadSignature:
+        return None
+    if not (user.is_authenticated and user.is_staff and payload.get('uid') == user.pk):
+        return None
+    return payload.get('mode') if payload.get('mode') in MODES else None
+
+
+class StackSampler:
+    """
+    Samples one thread's stack at a fixed interval and counts collapsed stacks.
+    """
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f'{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})')
+                frame = frame.f_back
+            if frames:
+                self.stacks[';'.join(reversed(frames))] += 1
+
+    def dump(self, path):
+        with open(path, 'w') as fh:
+            for stack, count in self.stacks.most_common():
+                fh.write(f'{stack} {count}\n')
+
+
+def profile_filename(request, mode):
+    slug = re.sub(r'[^A-Za-z0-9]+', '-', request.path).strip('-') or 'root'
+    stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+    return f'{stamp}-{slug[:80]}{EXTENSIONS[mode]}'
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # Cheap string checks first so untriggered requests cost nothing extra.
+        if PROFILE_PARAM not in request.META.get('QUERY_STRING', '') and PROFILE_HEADER not in request.META:
+            return self.get_response(request)
+
+        token = request.GET.get(PROFILE_PARAM) or request.META.get(PROFILE_HEADER, '')
+        mode = read_token(token, request.user)
+        if mode is None:
+            return self.get_response(request)
+
+        directory = profile_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        filename = profile_filename(request, mode)
+
+        if mode == 'sample':
+            sampler = StackSampler(threading.get_ident())
+            sampler.start()
+            try:
+                response = self.get_response(request)
+            finally:
+                sampler.stop()
+                sampler.dump(directory / filename)
+        else:
+            # cProfile and pstats are only imported when a request is profiled,
+            # as they add a few milliseconds to every worker's startup.
+            import cProfile
+
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+                profiler.dump_stats(directory / filename)
+
+        response['X-Catalog-Profile'] = filename
+        return response
+
+
+def top_functions(path, limit=10):
+    """
+    Returns (function, calls, own seconds, cumulative seconds) rows for a stored profile.
+    Sampled profiles report sample counts in place of calls, with no timings.
+    """
+    if path.suffix == '.collapsed':
+        leaves = Counter()
+        with open(path) as fh:
+            for line in fh:
+                stack, _, count = line.rstrip('\n').rpartition(' ')
+                leaves[stack.rsplit(';', 1)[-1]] += int(count)
+        return [(frame, count, None, None) for frame, count in leaves.most_common(limit)]
+
+    import pstats
+
+    stats = pstats.Stats(str(path)).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:limit]
+    return [
+        (f'{func} ({Path(filename).name}:{line})', calls, round(own, 4), round(cumulative, 4))
+        for (filename, line, func), (_, calls, own, cumulative, _) in rows
+    ]
+
+
+def recent_profiles(limit=20):
+    directory = profile_dir()
+    if not directory.is_dir():
+        return []
+    paths = [p for p in directory.iterdir() if p.suffix in EXTENSIONS.values()]
+    paths.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+    return [
+        {
+            'name': path.name,
+            'created': datetime.datetime.fromtimestamp(path.stat().st_mtime),
+            'size': path.stat().st_size,
+            'top': top_functions(path),
+        }
+        for path in paths[:limit]
+    ]
+
+
+def profile_path(name):
+    """
+    Resolves a stored profile by file name, refusing anything outside the profile directory.
+    """
+    path = profile_dir() / name
+    if Path(name).name != name or path.suffix not in EXTENSIONS.values() or not path.is_file():
+        return None
+    return path
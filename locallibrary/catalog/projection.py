@@ -0,0 +1,114 @@
+"""
+The catalog entry projection: one flat row per book holding everything the
+book listing shows, so the listing reads one table in primary key order instead
+of joining authors, languages and genres and counting copies.
+
+Entries are rewritten from the source tables whenever a book, copy, author,
+language or genre changes (see catalog/signals.py). Code that changes those
+tables with ``update()`` or ``bulk_create()``, which send no signals, calls
+``refresh_entries()`` itself. ``manage.py rebuild_catalog_projection`` rebuilds
+every entry.
+
+The CatalogEntry cache version only moves when an entry is added, dropped, or
+changes in something other than its copy counts. Every loan and return rewrites
+the counts, and what is keyed on the version (the count cache, the book list
+ETag) doesn't depend on them; the list ETag follows copy changes through
+``Book.updated_at``.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Prefetch, Q
+
+from .models import Book, CatalogEntry, Genre
+from .versions import bump_version
+
+TOP_GENRES = 3
+REBUILD_CHUNK_SIZE = 1000
+ENTRY_FIELDS = [
+    'title', 'url', 'author_pk', 'author_name', 'author_url', 'language_pk', 'language',
+    'genres', 'copies', 'available',
+]
+VERSIONED_FIELDS = [name for name in ENTRY_FIELDS if name not in ('copies', 'available')]
+
+
+def use_projection():
+    return getattr(settings, 'CATALOG_LIST_FROM_PROJECTION', False)
+
+
+def build_entries(book_ids):
+    books = (
+        Book.objects.filter(pk__in=book_ids)
+        .select_related('author', 'language')
+        .annotate(
+            copies=Count('bookinstance'),
+            available=Count('bookinstance', filter=Q(bookinstance__status__exact='a')),
+        )
+        .prefetch_related(Prefetch('genre', queryset=Genre.objects.order_by('pk')))
+    )
+    return [
+        CatalogEntry(
+            book=book,
+            title=book.title,
+            url=book.get_absolute_url(),
+            author_pk=book.author_id,
+            author_name=str(book.author) if book.author else '',
+            author_url=book.author.get_absolute_url() if book.author else '',
+            language_pk=book.language_id,
+            language=book.language.name if book.language else '',
+            genres=', '.join(genre.name for genre in list(book.genre.all())[:TOP_GENRES]),
+            copies=book.copies,
+            available=book.available,
+        )
+        for book in books
+    ]
+
+
+def refresh_entries(book_ids):
+    """
+    Rewrites the entries of the given books, and drops those of books that no
+    longer exist.
+    """
+    book_ids = {pk for pk in book_ids if pk is not None}
+    if not book_ids:
+        return
+    entries = build_entries(book_ids)
+    with transaction.atomic():
+        stored = {
+            book_id: values for book_id, *values in
+            CatalogEntry.objects.filter(book_id__in=book_ids).values_list('book_id', *VERSIONED_FIELDS)
+        }
+        missing = book_ids - {entry.book_id for entry in entries}
+        if missing:
+            CatalogEntry.objects.filter(book_id__in=missing).delete()
+        CatalogEntry.objects.bulk_create(
+            entries, update_conflicts=True, unique_fields=['book'], update_fields=ENTRY_FIELDS,
+        )
+    changed = set(stored) != {entry.book_id for entry in entries} or any(
+        stored[entry.book_id] != [getattr(entry, name) for name in VERSIONED_FIELDS] for entry in entries
+    )
+    if changed:
+        # bulk_create skips the model signals, so invalidate by hand.
+        bump_version(CatalogEntry)
+
+
+def refresh_entries_where(**lookups):
+    """
+    Refreshes the entries matching ``lookups``, e.g. every book by an author.
+    """
+    refresh_entries(list(CatalogEntry.objects.filter(**lookups).values_list('book_id', flat=True)))
+
+
+def rebuild(chunk_size=REBUILD_CHUNK_SIZE):
+    """
+    Rewrites every entry, ``chunk_size`` books per transaction. Returns the
+    number of books processed.
+    """
+    done = 0
+    last_pk = 0
+    while True:
+        ids = list(Book.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:chunk_size])
+        if not ids:
+            return done
+        refresh_entries(ids)
+        done += len(ids)
+        last_pk = ids[-1]
@@ -0,0 +1,118 @@
+"""
+SQLite FTS5 tables behind the autocomplete lookups (see catalog/autocomplete.py).
+
+catalog_book_search holds each book's title and catalog_author_search each
+author's "last first" and "first last" names, under the book's or author's
+primary key as rowid. Triggers on the source tables keep them in step with
+every insert, update and delete, including ``update()``, ``bulk_create()``
+and the deletion tasks, so nothing in Python has to rebuild or invalidate
+them.
+
+Migration 0011 creates the tables. Later migrations that rebuild catalog_book
+or catalog_author on SQLite drop the triggers with the old table, so
+``repair_search_tables()`` runs after every ``migrate`` and recreates a table
+that has lost a trigger. Other databases have no search tables; the autocomplete
+queries the source tables there.
+"""
+from django.db import connections, transaction
+
+SEARCH_SQL = {
+    'catalog_book_search': [
+        "CREATE VIRTUAL TABLE catalog_book_search USING fts5(title)",
+        """
+        CREATE TRIGGER catalog_book_search_insert AFTER INSERT ON catalog_book BEGIN
+            INSERT INTO catalog_book_search (rowid, title) VALUES (new.id, new.title);
+        END
+        """,
+        """
+        CREATE TRIGGER catalog_book_search_update AFTER UPDATE OF title ON catalog_book BEGIN
+            UPDATE catalog_book_search SET title = new.title WHERE rowid = old.id;
+        END
+        """,
+        """
+        CREATE TRIGGER catalog_book_search_delete AFTER DELETE ON catalog_book BEGIN
+            DELETE FROM catalog_book_search WHERE rowid = old.id;
+        END
+        """,
+        "INSERT INTO catalog_book_search (rowid, title) SELECT id, title FROM catalog_book",
+    ],
+    'catalog_author_search': [
+        "CREATE VIRTUAL TABLE catalog_author_search USING fts5(last_first, first_last, label UNINDEXED)",
+        """
+        CREATE TRIGGER catalog_author_search_insert AFTER INSERT ON catalog_author BEGIN
+            INSERT INTO catalog_author_search (rowid, last_first, first_last, label) VALUES (
+                new.id, new.last_name || ' ' || new.first_name, new.first_name || ' ' || new.last_name,
+                new.last_name || ', ' || new.first_name
+            );
+        END
+        """,
+        """
+        CREATE TRIGGER catalog_author_search_update AFTER UPDATE OF first_name, last_name ON catalog_author BEGIN
+            UPDATE catalog_author_search SET
+                last_first = new.last_name || ' ' || new.first_name,
+                first_last = new.first_name || ' ' || new.last_name,
+                label = new.last_name || ', ' || new.first_name
+            WHERE rowid = old.id;
+        END
+        """,
+        """
+        CREATE TRIGGER catalog_author_search_delete AFTER DELETE ON catalog_author BEGIN
+            DELETE FROM catalog_author_search WHERE rowid = old.id;
+        END
+        """,
+        """
+        INSERT INTO catalog_author_search (rowid, last_first, first_last, label)
+        SELECT id, last_name || ' ' || first_name, first_name || ' ' || last_name, last_name || ', ' || first_name
+        FROM catalog_author
+        """,
+    ],
+}
+
+
+def has_search_tables(connection):
+    return connection.vendor == 'sqlite'
+
+
+def install_search_tables(using='default', repair=False):
+    """
+    Creates any search table whose table or triggers are missing and fills it
+    from its source table. With ``repair``, only tables that exist but have lost
+    a trigger are recreated.
+    """
+    connection = connections[using]
+    if not has_search_tables(connection):
+        return
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        existing = {name for (name,) in cursor.fetchall()}
+        for table, statements in SEARCH_SQL.items():
+            source = table.removesuffix('_search')
+            if source not in existing or (repair and table not in existing):
+                continue
+            if {table, f'{table}_insert', f'{table}_update', f'{table}_delete'} <= existing:
+                continue
+            drop_search_table(cursor, table)
+            for statement in statements:
+                cursor.execute(statement)
+
+
+def repair_search_tables(using='default', **kwargs):
+    """
+    Connected to ``post_migrate``.
+    """
+    install_search_tables(using, repair=True)
+
+
+def remove_search_tables(using='default'):
+    connection = connections[using]
+    if not has_search_tables(connection):
+        return
+    with connection.cursor() as cursor:
+        for table in SEARCH_SQL:
+            drop_search_table(cursor, table)
+
+
+def drop_search_table(cursor, table):
+    cursor.execute(f'DROP TABLE IF EXISTS {table}')
+    for suffix in ('insert', 'update', 'delete'):
+        cursor.execute(f'DROP TRIGGER IF EXISTS {table}_{suffix}')
@@ -0,0 +1,204 @@
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+
+from django.contrib.auth.models import Group, Permission, User
+
+from .loans import invalidate_loan_summary
+from .models import Author, Book, BookInstance, Genre, Language
+from .permissions import invalidate_permissions
+from .projection import refresh_entries, refresh_entries_where
+from .versions import bump_version
+
+
+def is_catalog_model(model):
+    return model._meta.app_label == 'catalog'
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def catalog_model_changed(sender, **kwargs):
+    if is_catalog_model(sender):
+        bump_version(sender)
+
+
+@receiver(m2m_changed)
+def catalog_relation_changed(sender, instance, action, **kwargs):
+    if action.startswith('post_') and is_catalog_model(type(instance)):
+        bump_version(type(instance))
+
+
+# The foreign keys whose old value the receivers below also invalidate.
+TRACKED_FIELDS = {BookInstance: ('borrower_id', 'book_id'), Book: ('author_id',)}
+
+
+def remember_previous(model, objs, update_fields=None):
+    """
+    Notes on each of ``objs`` the stored values of its tracked foreign keys,
+    read with one query, before the objects are written.
+    """
+    fields = TRACKED_FIELDS[model]
+    pks = [obj.pk for obj in objs if not obj._state.adding]
+    names = {*fields, *(attname.removesuffix('_id') for attname in fields)}
+    if update_fields is not None and not names & set(update_fields):
+        # None of them is being written, so they keep their values.
+        pks = []
+    rows = {}
+    if pks:
+        rows = {row.pop('pk'): row for row in model._default_manager.filter(pk__in=pks).values('pk', *fields)}
+    for obj in objs:
+        obj._previous = rows.get(obj.pk, {})
+
+
+def previous(instance, attname):
+    return getattr(instance, '_previous', {}).get(attname, getattr(instance, attname))
+
+
+@receiver(pre_save, sender=BookInstance)
+@receiver(pre_save, sender=Book)
+def remember_saved_values(sender, instance, update_fields=None, **kwargs):
+    remember_previous(sender, [instance], update_fields)
+
+
+@receiver(pre_delete, sender=BookInstance)
+@receiver(pre_delete, sender=Book)
+def forget_saved_values(sender, instance, **kwargs):
+    # A delete doesn't move the row, so only its current values matter.
+    instance._previous = {}
+
+
+@receiver(post_save, sender=BookInstance)
+@receiver(post_delete, sender=BookInstance)
+def book_instance_loan_changed(sender, instance, **kwargs):
+    invalidate_loan_summary(previous(instance, 'borrower_id'), instance.borrower_id)
+
+
+def touch(model, *pks):
+    """
+    Moves updated_at forward without a save(), so no further signals fire.
+    """
+    pks = {pk for pk in pks if pk is not None}
+    if pks:
+        model.objects.filter(pk__in=pks).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=BookInstance)
+@receiver(post_delete, sender=BookInstance)
+def book_instance_changed(sender, instance, **kwargs):
+    touch(Book, previous(instance, 'book_id'), instance.book_id)
+    refresh_entries([previous(instance, 'book_id'), instance.book_id])
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+def book_changed(sender, instance, **kwargs):
+    touch(Author, previous(instance, 'author_id'), instance.author_id)
+    refresh_entries([instance.pk])
+
+
+def genre_book_ids(genre):
+    return list(Book.genre.through.objects.filter(genre=genre).values_list('book_id', flat=True))
+
+
+@receiver(m2m_changed, sender=Book.genre.through)
+def book_genres_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        # post_clear has no pk_set, so note which books the genre is leaving.
+        instance._cleared_book_ids = genre_book_ids(instance)
+    if not action.startswith('post_'):
+        return
+    if reverse:
+        book_ids = getattr(instance, '_cleared_book_ids', ()) if action == 'post_clear' else pk_set
+        touch(Book, *(book_ids or ()))
+        refresh_entries(book_ids or ())
+    else:
+        touch(Book, instance.pk)
+        refresh_entries([instance.pk])
+
+
+@receiver(pre_delete, sender=Author)
+def author_deleting(sender, instance, **kwargs):
+    # The delete nulls Book.author with an UPDATE that sends no signals, so move
+    # the books' updated_at (and with it their pages' validators) on here.
+    touch(Book, *Book.objects.filter(author=instance).values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+def author_changed(sender, instance, **kwargs):
+    refresh_entries_where(author_pk=instance.pk)
+
+
+@receiver(post_save, sender=Language)
+@receiver(post_delete, sender=Language)
+def language_changed(sender, instance, **kwargs):
+    refresh_entries_where(language_pk=instance.pk)
+
+
+@receiver(pre_delete, sender=Genre)
+def remember_genre_books(sender, instance, **kwargs):
+    # The genre's links to its books are gone by post_delete.
+    instance._book_ids = genre_book_ids(instance)
+
+
+@receiver(post_save, sender=Genre)
+def genre_saved(sender, instance, **kwargs):
+    refresh_entries(genre_book_ids(instance))
+
+
+@receiver(post_delete, sender=Genre)
+def genre_deleted(sender, instance, **kwargs):
+    refresh_entries(instance._book_ids)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    # Every login saves last_login, which doesn't change any permission.
+    if update_fields is None or set(update_fields) != {'last_login'}:
+        invalidate_permissions(instance.pk)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def user_permissions_changed(sender, instance, action, reverse, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if reverse:
+        # Changed from the group or permission side, possibly for many users.
+        bump_version(type(instance))
+    else:
+        invalidate_permissions(instance.pk)
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, action='post_', **kwargs):
+    if action.startswith('post_'):
+        bump_version(Group)
+
+
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def permission_changed(sender, **kwargs):
+    bump_version(Permission)
+
+
+def bulk_saved(model, objs):
+    """
+    Does for objects written with bulk_create() or bulk_update(), which send no
+    signals, what the receivers above do for a save(). Call
+    remember_previous(model, objs) before writing them.
+    """
+    bump_version(model)
+    if model is BookInstance:
+        invalidate_loan_summary(*{pk for obj in objs for pk in (previous(obj, 'borrower_id'), obj.borrower_id)})
+        book_ids = {pk for obj in objs for pk in (previous(obj, 'book_id'), obj.book_id)}
+        touch(Book, *book_ids)
+        refresh_entries(book_ids)
+    elif model is Book:
+        touch(Author, *{pk for obj in objs for pk in (previous(obj, 'author_id'), obj.author_id)})
+        refresh_entries([obj.pk for obj in objs])
+    elif model is Author:
+        refresh_entries_where(author_pk__in=[obj.pk for obj in objs])
@@ -0,0 +1,128 @@
+"""
+Worker cold-start measurements for ``manage.py startup_profile``.
+
+``main()`` runs in a fresh ``python -X importtime`` process. It times the same
+steps a WSGI worker goes through: importing settings, ``django.setup()`` (with
+the import, models and ready() time of each app), building the WSGI handler, and
+the first and second responses for a path. It prints them as JSON on stdout,
+along with the wall clock time of the first response so the parent can work out
+the time from process launch. The parent reads the per-module import costs from
+stderr with ``parse_importtime()``.
+
+Nothing here imports Django at module level, so loading this module does not
+skew what it measures.
+"""
+import json
+import os
+import sys
+import time
+
+
+def parse_importtime(text):
+    """
+    Parses ``-X importtime`` output into (module, self_us, cumulative_us, depth) tuples.
+    """
+    rows = []
+    for line in text.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def package_totals(rows):
+    """
+    Sums import self time by package, largest first. Django contrib apps and
+    catalog modules are listed one by one, everything else by top-level package.
+    """
+    totals = {}
+    for name, self_us, _, _ in rows:
+        parts = name.split('.')
+        if parts[:2] == ['django', 'contrib']:
+            package = '.'.join(parts[:3])
+        elif parts[0] == 'catalog':
+            package = '.'.join(parts[:2])
+        else:
+            package = parts[0]
+        totals[package] = totals.get(package, 0) + self_us
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def time_app_configs(timings):
+    """
+    Wraps AppConfig.create so every app's import, models import and ready()
+    are timed as ``django.setup()`` runs them.
+    """
+    from django.apps.config import AppConfig
+
+    create = AppConfig.create.__func__
+
+    def timed(label, func):
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timings.setdefault(label(), {})[func.__name__] = time.perf_counter() - started
+        return wrapper
+
+    def timed_create(cls, entry):
+        started = time.perf_counter()
+        app_config = create(cls, entry)
+        timings.setdefault(app_config.label, {})['create'] = time.perf_counter() - started
+        app_config.import_models = timed(lambda: app_config.label, app_config.import_models)
+        app_config.ready = timed(lambda: app_config.label, app_config.ready)
+        return app_config
+
+    AppConfig.create = classmethod(timed_create)
+
+
+def request(application, path):
+    from wsgiref.util import setup_testing_defaults
+
+    environ = {'PATH_INFO': path}
+    setup_testing_defaults(environ)
+    status = []
+    started = time.perf_counter()
+    body = b''.join(application(environ, lambda s, headers, exc_info=None: status.append(s)))
+    return time.perf_counter() - started, status[0], len(body)
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else '/catalog/'
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'locallibrary.settings')
+    phases = {}
+    apps = {}
+
+    started = time.perf_counter()
+    from django.conf import settings
+    settings.INSTALLED_APPS
+    phases['settings'] = time.perf_counter() - started
+
+    import django
+    time_app_configs(apps)
+    mark = time.perf_counter()
+    django.setup(set_prefix=False)
+    phases['setup'] = time.perf_counter() - mark
+
+    from django.core.handlers.wsgi import WSGIHandler
+    mark = time.perf_counter()
+    application = WSGIHandler()
+    phases['wsgi_handler'] = time.perf_counter() - mark
+
+    phases['first_response'], status, size = request(application, path)
+    first_response_at = time.time()
+    phases['second_response'], _, _ = request(application, path)
+
+    json.dump({
+        'path': path,
+        'first_response_at': first_response_at,
+        'status': status,
+        'bytes': size,
+        'phases': phases,
+        'apps': apps,
+        'installed_apps': list(settings.INSTALLED_APPS),
+        'loaded_catalog_modules': sorted(name for name in sys.modules if name.startswith('catalog.')),
+    }, sys.stdout)
@@ -0,0 +1,70 @@
+// Turns <select data-autocomplete-url="..."> into a search box that fills the
+// select's options from the catalog autocomplete endpoint.
+(function () {
+  'use strict';
+
+  function attach(select) {
+    if (select.dataset.autocompleteReady) {
+      return;
+    }
+    select.dataset.autocompleteReady = '1';
+
+    var input = document.createElement('input');
+    input.type = 'search';
+    input.placeholder = 'Type to search…';
+    input.autocomplete = 'off';
+    select.parentNode.insertBefore(input, select);
+
+    var timer = null;
+    var latest = 0;
+
+    function render(results) {
+      var keep = [];
+      Array.prototype.forEach.call(select.options, function (option) {
+        if (option.value === '' || option.selected) {
+          keep.push(option);
+        }
+      });
+      select.innerHTML = '';
+      keep.forEach(function (option) { select.appendChild(option); });
+      results.forEach(function (result) {
+        if (keep.some(function (option) { return option.value === String(result.id); })) {
+          return;
+        }
+        var option = document.createElement('option');
+        option.value = result.id;
+        option.textContent = result.text;
+        select.appendChild(option);
+      });
+    }
+
+    input.addEventListener('input', function () {
+      clearTimeout(timer);
+      timer = setTimeout(function () {
+        var query = input.value.trim();
+        var request = ++latest;
+        if (!query) {
+          render([]);
+          return;
+        }
+        fetch(select.dataset.autocompleteUrl + '?q=' + encodeURIComponent(query), {credentials: 'same-origin'})
+          .then(function (response) { return response.json(); })
+          .then(function (data) {
+            if (request === latest) {
+              render(data.results);
+            }
+          });
+      }, 150);
+    });
+  }
+
+  function attachAll() {
+    document.querySelectorAll('select[data-autocomplete-url]').forEach(attach);
+  }
+
+  if (document.readyState === 'loading') {
+    document.addEventListener('DOMContentLoaded', attachAll);
+  } else {
+    attachAll();
+  }
+}());
@@ -0,0 +1,253 @@
+"""
+A small database-backed task queue.
+
+Views call ``enqueue()`` to hand slow side effects to ``manage.py
+run_catalog_worker`` and return straight away. Tasks are plain functions
+registered with ``@task(name)`` that take the JSON payload as keyword
+arguments. Failed attempts are retried with exponential backoff up to
+``max_attempts``, and an idempotency key makes enqueueing the same work twice
+a no-op.
+"""
+import contextlib
+import datetime
+import logging
+import threading
+import time
+import traceback
+
+from django.conf import settings
+from django.core.mail import send_mail, send_mass_mail
+from django.db import IntegrityError, connections, transaction
+from django.db.models import Avg, Count, F, Q, Sum
+from django.utils import timezone
+
+from .deletion import chunked_delete
+from .models import Author, Book, BookInstance, Task
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+
+def task(name):
+    """
+    Registers a function as the handler for tasks called ``name``.
+    """
+    def decorator(func):
+        registry[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, payload=None, idempotency_key=None, max_attempts=3, delay=0, retry=False):
+    """
+    Queues a task and returns it. With an idempotency key, an existing task with
+    the same key is returned instead of queueing a duplicate. With ``retry`` as
+    well, an existing task that has finished or failed is queued again; only
+    pass it for work that is safe to repeat.
+    """
+    if name not in registry:
+        raise ValueError(f"Unknown task '{name}'")
+    fields = {
+        'name': name,
+        'payload': payload or {},
+        'max_attempts': max_attempts,
+        'run_after': timezone.now() + datetime.timedelta(seconds=delay),
+    }
+    if idempotency_key is None:
+        return Task.objects.create(**fields)
+    try:
+        with transaction.atomic():
+            return Task.objects.create(idempotency_key=idempotency_key, **fields)
+    except IntegrityError:
+        if retry:
+            Task.objects.filter(idempotency_key=idempotency_key, status__in=[Task.DONE, Task.FAILED]).update(
+                status=Task.QUEUED, attempts=0, started=None, finished=None, duration=None, last_error='',
+                progress={}, **fields,
+            )
+        return Task.objects.get(idempotency_key=idempotency_key)
+
+
+def claim_next():
+    """
+    Marks the oldest due task as running and returns it, or None if the queue is empty.
+    The conditional UPDATE makes sure only one worker wins each task.
+    """
+    now = timezone.now()
+    candidates = (
+        Task.objects.filter(status=Task.QUEUED, run_after__lte=now)
+        .order_by('run_after').values_list('pk', flat=True)[:10]
+    )
+    for pk in candidates:
+        claimed = Task.objects.filter(pk=pk, status=Task.QUEUED).update(
+            status=Task.RUNNING, started=now, attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Task.objects.get(pk=pk)
+    return None
+
+
+def retry_delay(attempts):
+    return getattr(settings, 'CATALOG_TASK_RETRY_DELAY', 5) * 2 ** (attempts - 1)
+
+
+@contextlib.contextmanager
+def heartbeat(task):
+    """
+    Moves a running task's ``started`` on every CATALOG_TASK_HEARTBEAT seconds,
+    so requeue_stale() only picks up tasks whose worker has stopped, however
+    long they take.
+    """
+    interval = getattr(settings, 'CATALOG_TASK_HEARTBEAT', 60)
+    stopped = threading.Event()
+
+    def beat():
+        try:
+            while not stopped.wait(interval):
+                Task.objects.filter(pk=task.pk, status=Task.RUNNING).update(started=timezone.now())
+        finally:
+            connections.close_all()
+
+    thread = threading.Thread(target=beat, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stopped.set()
+        thread.join()
+
+
+def run_task(task):
+    """
+    Runs a claimed task and records the outcome. Returns True on success.
+    """
+    started = time.perf_counter()
+    try:
+        handler = registry[task.name]
+        with heartbeat(task):
+            handler(**task.payload)
+    except Exception:
+        task.duration = time.perf_counter() - started
+        task.last_error = traceback.format_exc()
+        if task.attempts < task.max_attempts:
+            task.status = Task.QUEUED
+            task.run_after = timezone.now() + datetime.timedelta(seconds=retry_delay(task.attempts))
+        else:
+            task.status = Task.FAILED
+            task.finished = timezone.now()
+        logger.warning("Task %s (%s) failed on attempt %s", task.pk, task.name, task.attempts)
+        task.save(update_fields=['status', 'run_after', 'finished', 'duration', 'last_error'])
+        return False
+
+    task.status = Task.DONE
+    task.finished = timezone.now()
+    task.duration = time.perf_counter() - started
+    task.save(update_fields=['status', 'finished', 'duration'])
+    return True
+
+
+def requeue_stale(timeout=None):
+    """
+    Puts back tasks left running by a worker that died mid-task, that is running
+    tasks without a heartbeat for longer than the timeout. Claiming the task
+    already counted the lost run as an attempt, so a task that keeps taking its
+    worker down is marked failed at ``max_attempts`` instead of being requeued
+    forever. Returns the number of tasks requeued.
+    """
+    timeout = timeout or getattr(settings, 'CATALOG_TASK_TIMEOUT', 15 * 60)
+    now = timezone.now()
+    stale = Task.objects.filter(status=Task.RUNNING, started__lt=now - datetime.timedelta(seconds=timeout))
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Task.FAILED, finished=now, last_error='The worker stopped while running this task.',
+    )
+    if failed:
+        logger.warning("Marked %s stale task(s) failed after their last attempt", failed)
+    return stale.update(status=Task.QUEUED)
+
+
+def work(burst=False, poll_interval=1.0, max_tasks=None, should_stop=None):
+    """
+    Runs tasks until stopped. With ``burst`` the loop returns once the queue is empty.
+    Returns the number of tasks run.
+    """
+    processed = 0
+    while max_tasks is None or processed < max_tasks:
+        if should_stop is not None and should_stop():
+            break
+        task = claim_next()
+        if task is None:
+            if burst:
+                break
+            time.sleep(poll_interval)
+            continue
+        run_task(task)
+        processed += 1
+    return processed
+
+
+def task_stats(since=None):
+    """
+    Per task type counts, mean duration and throughput (done per second) since a
+    point in time, for the tasks finished in that window.
+    """
+    since = since or timezone.now() - datetime.timedelta(hours=1)
+    window = max((timezone.now() - since).total_seconds(), 1)
+    rows = (
+        Task.objects.filter(Q(finished__gte=since) | Q(status__in=[Task.QUEUED, Task.RUNNING]))
+        .values('name')
+        .annotate(
+            done=Count('pk', filter=Q(status=Task.DONE)),
+            failed=Count('pk', filter=Q(status=Task.FAILED)),
+            queued=Count('pk', filter=Q(status=Task.QUEUED)),
+            running=Count('pk', filter=Q(status=Task.RUNNING)),
+            mean_duration=Avg('duration', filter=Q(status=Task.DONE)),
+            busy=Sum('duration', filter=Q(status=Task.DONE)),
+        )
+        .order_by('name')
+    )
+    return {
+        row['name']: {
+            'done': row['done'],
+            'failed': row['failed'],
+            'queued': row['queued'],
+            'running': row['running'],
+            'mean_duration_s': round(row['mean_duration'] or 0, 4),
+            'throughput_per_s': round(row['done'] / window, 4),
+            'tasks_per_busy_s': round(row['done'] / row['busy'], 2) if row['busy'] else None,
+        }
+        for row in rows
+    }
+
+
+@task('catalog.notify_renewal')
+def notify_renewal(bookinstance):
+    """
+    Tells the borrower that their loan has been renewed.
+    """
+    copy = BookInstance.objects.select_related('book', 'borrower').filter(pk=bookinstance).first()
+    if copy is None or copy.borrower is None or not copy.borrower.email:
+        return
+    send_mail(
+        f"Loan renewed: {copy.book.title if copy.book else copy.imprint}",
+        f"Your loan has been renewed. The new due date is {copy.due_back}.",
+        None,
+        [copy.borrower.email],
+    )
+
+
+@task('catalog.send_mass_mail')
+def mass_mail(messages):
+    """
+    Sends a list of [subject, message, from_email, recipient_list] messages over one connection.
+    """
+    send_mass_mail([tuple(message) for message in messages])
+
+
+@task('catalog.chunked_delete')
+def delete_in_chunks(model, pk):
+    """
+    Deletes a large author or book, detaching its dependents in chunks.
+    """
+    obj = {'author': Author, 'book': Book}[model].objects.filter(pk=pk).first()
+    if obj is not None:
+        chunked_delete(obj)
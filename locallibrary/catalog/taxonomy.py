@@ -0,0 +1,100 @@
+"""
+In-process registry of genres and languages.
+
+Both tables are tiny and rarely change, yet book pages, genre lists and book
+forms read them on every request. Each worker keeps every row in memory, keyed
+by id and by lowercased name (matching the Lower('name') constraint on
+languages), and reloads a table when its cache version has moved on. The change
+signals bump the versions (see catalog/signals.py). ``preload()`` loads both
+tables when the worker starts (see locallibrary/wsgi.py).
+
+The objects are shared by every request the worker serves, so treat them as
+read-only.
+"""
+import threading
+
+from django.db import DatabaseError
+
+from .models import Book, Genre, Language
+from .versions import get_version
+
+
+class Registry:
+    def __init__(self, model):
+        self.model = model
+        self.lock = threading.Lock()
+        self.version = None
+        self.objects = []
+        self.lookup = {}
+        self.names = {}
+
+    def refresh(self):
+        version = get_version(self.model)
+        if version != self.version:
+            with self.lock:
+                if version != self.version:
+                    objects = list(self.model._default_manager.order_by('pk'))
+                    names = {}
+                    for obj in objects:
+                        names.setdefault(obj.name.lower(), obj)
+                    self.objects, self.names = objects, names
+                    self.lookup = {str(obj.pk): obj for obj in objects}
+                    self.version = version
+        return self
+
+    def all(self):
+        return self.refresh().objects
+
+    def get(self, pk):
+        """
+        Returns the object with primary key ``pk``, or None.
+        """
+        return self.refresh().lookup.get(str(pk))
+
+    def get_by_name(self, name):
+        """
+        Returns the object whose name matches ``name`` ignoring case, or None.
+        """
+        return self.refresh().names.get(name.lower())
+
+
+genres = Registry(Genre)
+languages = Registry(Language)
+registries = {Genre: genres, Language: languages}
+
+
+def preload():
+    try:
+        for registry in registries.values():
+            registry.refresh()
+    except DatabaseError:
+        # Not migrated yet; the first request that needs a registry loads it.
+        pass
+
+
+def attach(books):
+    """
+    Fills in the language and genres of each book from the registries, so
+    ``book.language`` and ``book.genre.all()`` don't query per book. The genre
+    ids of all the books are read with one query on the book-genre table.
+    Returns the books as a list.
+    """
+    books = list(books)
+    if not books:
+        return books
+    genre_ids = {}
+    rows = (
+        Book.genre.through.objects.filter(book_id__in=[book.pk for book in books])
+        .order_by('genre_id').values_list('book_id', 'genre_id')
+    )
+    for book_id, genre_id in rows:
+        genre_ids.setdefault(book_id, []).append(genre_id)
+    language_field = Book._meta.get_field('language')
+    for book in books:
+        language_field.set_cached_value(book, languages.get(book.language_id) if book.language_id else None)
+        # The same cache prefetch_related('genre') fills in.
+        queryset = book.genre.get_queryset()
+        queryset._result_cache = [genre for genre in map(genres.get, genre_ids.get(book.pk, ())) if genre]
+        queryset._prefetch_done = True
+        book.__dict__.setdefault('_prefetched_objects_cache', {})['genre'] = queryset
+    return books
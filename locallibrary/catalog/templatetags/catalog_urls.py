@@ -0,0 +1,19 @@
+from django import template
+
+from catalog.fasturls import build_url, url_template
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def fast_url(context, viewname, arg):
+    """
+    {% fast_url 'book-detail' book.pk %} - a cached {% url %} for single-argument catalog routes.
+    The route template is looked up once per render, not once per loop iteration.
+    """
+    templates = context.render_context.get('catalog_url_templates')
+    if templates is None:
+        templates = context.render_context['catalog_url_templates'] = {}
+    if viewname not in templates:
+        templates[viewname] = url_template(viewname)
+    return build_url(templates[viewname], viewname, arg)
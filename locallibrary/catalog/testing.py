@@ -0,0 +1,143 @@
+"""
+Test runner that starts each run from a migrated SQLite snapshot.
+
+Migrating an empty test database takes the same work on every run. The first
+run with a given set of migrations saves the migrated database to
+``CATALOG_TEST_SNAPSHOT_DIR``. Later runs copy that file into the test database
+with the SQLite backup API instead of calling ``migrate``. The snapshot is keyed
+by a hash of every migration file and the Django version, so adding or editing
+a migration makes a new one.
+
+``--parallel N`` works as usual. Django copies the restored database once per
+worker. Pass ``--no-snapshot`` to migrate from scratch.
+
+The cache is pointed at a temporary directory for the run, with one per
+parallel worker, so tests that clear it neither touch the development cache nor
+each other.
+"""
+import hashlib
+import inspect
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connections
+from django.db.migrations.loader import MigrationLoader
+from django.test.runner import DiscoverRunner, ParallelTestSuite, _init_worker
+from django.test.utils import get_unique_databases_and_mirrors, override_settings
+
+
+def migrations_hash():
+    digest = hashlib.sha256(django.get_version().encode())
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    for key in sorted(loader.disk_migrations):
+        migration = loader.disk_migrations[key]
+        digest.update('.'.join(key).encode())
+        with open(inspect.getsourcefile(sys.modules[migration.__module__]), 'rb') as source:
+            digest.update(source.read())
+    return digest.hexdigest()[:16]
+
+
+def snapshot_dir():
+    return getattr(settings, 'CATALOG_TEST_SNAPSHOT_DIR', settings.BASE_DIR / '.test-snapshots')
+
+
+def cache_settings(location):
+    return {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}}
+
+
+class WorkerCacheParallelTestSuite(ParallelTestSuite):
+    def init_worker(*args):
+        _init_worker(*args)
+        # Each worker process gets its own cache directory. The worker exits
+        # without tearing this down; the run's directory holds them all.
+        location = Path(settings.CACHES['default']['LOCATION']) / f'worker-{os.getpid()}'
+        override_settings(CACHES=cache_settings(location)).enable()
+
+
+class SnapshotTestRunner(DiscoverRunner):
+    parallel_test_suite = WorkerCacheParallelTestSuite
+
+    def __init__(self, no_snapshot=False, **kwargs):
+        super().__init__(**kwargs)
+        self.use_snapshot = not no_snapshot
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--no-snapshot', action='store_true',
+            help='Migrate the test database from scratch instead of restoring the migrated snapshot.',
+        )
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cache_dir = tempfile.mkdtemp(prefix='catalog-test-cache-')
+        self.settings_override = override_settings(
+            CACHES=cache_settings(self.cache_dir),
+            # Tests never need slow password hashes. Hashing dominated logins and user creation.
+            PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+        )
+        self.settings_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.settings_override.disable()
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
+
+    def setup_databases(self, **kwargs):
+        if self.use_snapshot and not self.keepdb:
+            test_databases, _ = get_unique_databases_and_mirrors(kwargs.get('aliases'))
+            for _, aliases in test_databases.values():
+                connection = connections[aliases[0]]
+                if connection.vendor == 'sqlite':
+                    connection.creation.create_test_db = self.snapshot_create_test_db(connection)
+        return super().setup_databases(**kwargs)
+
+    def snapshot_create_test_db(self, connection):
+        creation = connection.creation
+        migrate_test_db = creation.create_test_db
+        path = snapshot_dir() / f'{connection.alias}-{migrations_hash()}.sqlite3'
+
+        def create_test_db(verbosity=1, autoclobber=False, serialize=True, keepdb=False):
+            if not path.exists():
+                test_database_name = migrate_test_db(verbosity, autoclobber, serialize, keepdb)
+                self.save_snapshot(connection, path)
+                return test_database_name
+
+            test_database_name = creation._create_test_db(verbosity, autoclobber, keepdb)
+            if verbosity >= 1:
+                creation.log(f"Restoring test database for alias '{connection.alias}' from {path.name}...")
+            connection.close()
+            settings.DATABASES[connection.alias]['NAME'] = test_database_name
+            connection.settings_dict['NAME'] = test_database_name
+            connection.ensure_connection()
+            snapshot = sqlite3.connect(path)
+            try:
+                snapshot.backup(connection.connection)
+            finally:
+                snapshot.close()
+            if serialize:
+                connection._test_serialized_contents = creation.serialize_db_to_string()
+            call_command('createcachetable', database=connection.alias)
+            return test_database_name
+
+        return create_test_db
+
+    def save_snapshot(self, connection, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        for stale in path.parent.glob(f'{connection.alias}-*.sqlite3'):
+            stale.unlink()
+        partial = path.with_suffix('.partial')
+        target = sqlite3.connect(partial)
+        try:
+            connection.connection.backup(target)
+        finally:
+            target.close()
+        partial.replace(path)
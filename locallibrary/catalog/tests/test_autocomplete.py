@@ -0,0 +1,82 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from catalog.autocomplete import indexes
+from catalog.forms import BookForm
+from catalog.models import Author, Book, Genre, Language
+from catalog.search import repair_search_tables
+
+
+class AutocompleteTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tolkien = Author.objects.create(first_name='John', last_name='Tolkien')
+        Author.objects.create(first_name='Terry', last_name='Pratchett')
+        cls.book = Book.objects.create(title='The Lord of the Rings', summary='Summary', isbn='ABCDEFG',
+                                       author=cls.tolkien)
+        Book.objects.create(title='The Hobbit', summary='Summary', isbn='ABCDEFG', author=cls.tolkien)
+
+    def test_title_matches_from_any_word_start(self):
+        self.assertEqual(indexes['book'].search('rin'), [(self.book.pk, 'The Lord of the Rings')])
+        self.assertEqual(len(indexes['book'].search('the')), 2)
+
+    def test_author_matches_first_or_last_name(self):
+        self.assertEqual(indexes['author'].search('tolk'), [(self.tolkien.pk, 'Tolkien, John')])
+        self.assertEqual(indexes['author'].search('JOHN t'), [(self.tolkien.pk, 'Tolkien, John')])
+
+    def test_titles_starting_with_the_query_come_first(self):
+        mort = Book.objects.create(title='Mort', summary='Summary', isbn='123')
+        Book.objects.create(title='Death of Mortals', summary='Summary', isbn='123')
+        self.assertEqual(indexes['book'].search('mort')[0], (mort.pk, 'Mort'))
+        self.assertEqual(indexes['book'].search('mort', limit=1), [(mort.pk, 'Mort')])
+
+    def test_index_follows_changes_without_signals(self):
+        new, = Author.objects.bulk_create([Author(first_name='Ursula', last_name='Le Guin')])
+        self.assertEqual(indexes['author'].search('le g'), [(new.pk, 'Le Guin, Ursula')])
+        Author.objects.filter(pk=new.pk).update(last_name='K. Le Guin')
+        self.assertEqual(indexes['author'].search('le g'), [])
+        self.assertEqual(indexes['author'].search('ursula k'), [(new.pk, 'K. Le Guin, Ursula')])
+        Book.objects.filter(pk=self.book.pk).delete()
+        self.assertEqual(indexes['book'].search('rin'), [])
+
+    def test_missing_triggers_are_recreated(self):
+        # As after a migration that rebuilt the author table.
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER catalog_author_search_insert')
+        repair_search_tables()
+        new = Author.objects.create(first_name='Ursula', last_name='Le Guin')
+        self.assertEqual(indexes['author'].search('ursula'), [(new.pk, 'Le Guin, Ursula')])
+        self.assertEqual(indexes['author'].search('tolk'), [(self.tolkien.pk, 'Tolkien, John')])
+
+    def test_query_syntax_is_searched_literally(self):
+        self.assertEqual(indexes['book'].search('"lord" OR *'), [])
+        self.assertEqual(indexes['book'].search('-'), [])
+
+    def test_endpoint_returns_json(self):
+        response = self.client.get(reverse('autocomplete', args=['author']), {'q': 'prat'})
+        self.assertEqual(response.json(), {'results': [{'id': response.json()['results'][0]['id'],
+                                                        'text': 'Pratchett, Terry'}]})
+        self.assertEqual(self.client.get(reverse('autocomplete', args=['genre'])).status_code, 404)
+
+    def test_widget_renders_only_selected_author(self):
+        html = BookForm(instance=self.book)['author'].as_widget()
+        self.assertIn('data-autocomplete-url="/catalog/autocomplete/author/"', html)
+        self.assertIn('Tolkien, John', html)
+        self.assertNotIn('Pratchett', html)
+
+    def test_book_form_still_validates_any_author(self):
+        form = BookForm(data={
+            'title': 'Mort', 'summary': 'Summary', 'isbn': '123',
+            'author': Author.objects.get(last_name='Pratchett').pk,
+            'genre': [Genre.objects.create(name='Fantasy').pk],
+            'language': Language.objects.create(name='English').pk,
+        })
+        self.assertTrue(form.is_valid(), form.errors)
+
+    def test_admin_book_instance_form_uses_widget(self):
+        User.objects.create_superuser(username='admin', password='QWEasd123!')
+        self.client.login(username='admin', password='QWEasd123!')
+        response = self.client.get(reverse('admin:catalog_bookinstance_add'))
+        self.assertContains(response, 'data-autocomplete-url="/catalog/autocomplete/book/"')
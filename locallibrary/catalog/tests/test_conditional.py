@@ -0,0 +1,75 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from catalog.deletion import chunked_delete
+from catalog.models import Author, Book, BookInstance
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Author.objects.create(first_name='John', last_name='Smith')
+        cls.book = Book.objects.create(title='Book Title', summary='Summary', isbn='ABCDEFG', author=cls.author)
+        User.objects.create_user(username='reader', password='QWEasd123!')
+
+    def test_anonymous_detail_has_validators_and_public_caching(self):
+        response = self.client.get(reverse('book-detail', args=[self.book.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertNotIn('sessionid', response.cookies)
+
+    def test_matching_etag_gets_304_after_one_query(self):
+        url = reverse('book-detail', args=[self.book.pk])
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_copy_change_invalidates_book_and_author_pages(self):
+        book_url = reverse('book-detail', args=[self.book.pk])
+        author_url = reverse('author-detail', args=[self.author.pk])
+        book_etag = self.client.get(book_url)['ETag']
+        author_etag = self.client.get(author_url)['ETag']
+
+        BookInstance.objects.create(book=self.book, imprint='New Imprint')
+
+        self.assertEqual(self.client.get(book_url, HTTP_IF_NONE_MATCH=book_etag).status_code, 200)
+        self.assertEqual(self.client.get(author_url, HTTP_IF_NONE_MATCH=author_etag).status_code, 200)
+
+    def test_author_delete_invalidates_book_page(self):
+        url = reverse('book-detail', args=[self.book.pk])
+        # The book changed after its author, so its own timestamp is the newest.
+        Book.objects.filter(pk=self.book.pk).update(updated_at=timezone.now())
+        etag = self.client.get(url)['ETag']
+        Author.objects.get(pk=self.author.pk).delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_chunked_author_delete_invalidates_book_page(self):
+        url = reverse('book-detail', args=[self.book.pk])
+        # The book changed after its author, so its own timestamp is the newest.
+        Book.objects.filter(pk=self.book.pk).update(updated_at=timezone.now())
+        etag = self.client.get(url)['ETag']
+        chunked_delete(Author.objects.get(pk=self.author.pk), pause=0)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_list_etag_changes_when_author_renamed(self):
+        url = reverse('books')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.author.last_name = 'Smythe'
+        self.author.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_signed_in_users_get_private_uncached_pages(self):
+        self.client.login(username='reader', password='QWEasd123!')
+        response = self.client.get(reverse('authors'))
+        self.assertNotIn('ETag', response)
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_index_does_not_start_anonymous_sessions(self):
+        response = self.client.get(reverse('index'))
+        self.assertNotIn('sessionid', response.cookies)
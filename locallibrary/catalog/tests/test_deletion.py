@@ -0,0 +1,73 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from catalog import tasks
+from catalog.deletion import chunked_delete, get_progress, start_chunked_delete
+from catalog.models import Author, Book, BookInstance, Genre, Task
+
+
+@override_settings(CATALOG_DELETE_CHUNK_PAUSE=0)
+class ChunkedDeleteTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = Author.objects.create(first_name='Prolific', last_name='Writer')
+        cls.genre = Genre.objects.create(name='Fantasy')
+        cls.books = [
+            Book.objects.create(title=f'Book {i}', summary='Summary', isbn='ABCDEFG', author=cls.author)
+            for i in range(7)
+        ]
+        cls.books[0].genre.add(cls.genre)
+        for i in range(5):
+            BookInstance.objects.create(book=cls.books[0], imprint='Imprint')
+
+    def test_author_dependents_are_detached_in_chunks(self):
+        pk = self.author.pk
+        self.assertEqual(chunked_delete(self.author, chunk_size=3), 7)
+        self.assertFalse(Author.objects.filter(pk=pk).exists())
+        self.assertEqual(Book.objects.filter(author__isnull=True).count(), 7)
+
+    def test_book_dependents_are_detached(self):
+        pk = self.books[0].pk
+        chunked_delete(self.books[0], chunk_size=2)
+        self.assertFalse(Book.objects.filter(pk=pk).exists())
+        self.assertEqual(BookInstance.objects.filter(book__isnull=True).count(), 5)
+        self.assertTrue(Genre.objects.filter(pk=self.genre.pk).exists())
+
+    @override_settings(CATALOG_CHUNKED_DELETE_THRESHOLD=5)
+    def test_delete_view_queues_large_authors(self):
+        response = self.client.post(reverse('author_delete', args=[self.author.pk]))
+        self.assertRedirects(response, reverse('deletion-progress', args=['author', self.author.pk]))
+        self.assertTrue(Author.objects.filter(pk=self.author.pk).exists())
+        self.assertEqual(Task.objects.get().name, 'catalog.chunked_delete')
+
+        tasks.work(burst=True)
+        self.assertFalse(Author.objects.filter(pk=self.author.pk).exists())
+        response = self.client.get(reverse('deletion-progress', args=['author', self.author.pk]))
+        self.assertContains(response, 'Deleted.')
+
+    def test_progress_is_kept_on_the_task(self):
+        start_chunked_delete(self.author)
+        self.assertEqual(get_progress('author', self.author.pk), {'state': 'queued', 'done': 0, 'total': 7})
+        tasks.work(burst=True)
+        self.assertEqual(get_progress('author', self.author.pk), {'state': 'done', 'done': 7, 'total': 7})
+        self.assertIsNone(get_progress('book', self.books[0].pk))
+
+    def test_failed_deletion_can_be_retried(self):
+        task = start_chunked_delete(self.author)
+        Task.objects.filter(pk=task.pk).update(max_attempts=1)
+        with mock.patch('catalog.tasks.chunked_delete', side_effect=RuntimeError('database is locked')):
+            tasks.work(burst=True)
+        self.assertEqual(get_progress('author', self.author.pk)['state'], 'failed')
+        response = self.client.get(reverse('deletion-progress', args=['author', self.author.pk]))
+        self.assertContains(response, 'The deletion failed')
+        start_chunked_delete(self.author)
+        tasks.work(burst=True)
+        self.assertFalse(Author.objects.filter(pk=self.author.pk).exists())
+
+    def test_delete_view_deletes_small_authors_inline(self):
+        author = Author.objects.create(first_name='One', last_name='Book')
+        response = self.client.post(reverse('author_delete', args=[author.pk]))
+        self.assertRedirects(response, reverse('authors'))
+        self.assertFalse(Author.objects.filter(pk=author.pk).exists())
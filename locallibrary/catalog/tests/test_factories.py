@@ -0,0 +1,34 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from catalog.loans import loan_summary
+from catalog.models import Book, BookInstance
+from catalog.tests.factories import PASSWORD, create_library, create_users
+from catalog.versions import get_version
+
+
+class FactoriesTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_users_share_password_and_get_permissions(self):
+        librarian, reader = create_users('librarian', 'reader', permissions=['can_mark_returned'])
+        self.assertTrue(self.client.login(username='reader', password=PASSWORD))
+        self.assertTrue(librarian.has_perm('catalog.can_mark_returned'))
+        self.assertTrue(reader.has_perm('catalog.can_mark_returned'))
+
+    def test_library_links_genres_and_numbers_copies(self):
+        book, copies = create_library(copies=3, imprint=lambda i: f'Imprint {i}')
+        self.assertEqual([genre.name for genre in book.genre.all()], ['Fantasy'])
+        self.assertEqual(
+            sorted(BookInstance.objects.filter(book=book).values_list('imprint', flat=True)),
+            ['Imprint 0', 'Imprint 1', 'Imprint 2'],
+        )
+
+    def test_bulk_inserts_invalidate_caches(self):
+        reader, = create_users('reader')
+        book_version = get_version(Book)
+        self.assertEqual(loan_summary(reader)['count'], 0)
+        create_library(copies=2, borrower=reader, status='o')
+        self.assertGreater(get_version(Book), book_version)
+        self.assertEqual(loan_summary(reader)['count'], 2)
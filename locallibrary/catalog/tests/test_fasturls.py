@@ -0,0 +1,33 @@
+import uuid
+
+from django.template import Context, Template
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse, set_script_prefix
+
+from catalog.fasturls import fast_url
+
+
+class FastUrlTest(SimpleTestCase):
+    def test_matches_reverse_for_int_routes(self):
+        self.assertEqual(fast_url('book-detail', 7), reverse('book-detail', args=[7]))
+        self.assertEqual(fast_url('author-detail', 12), '/catalog/author/12')
+
+    def test_matches_reverse_for_uuid_routes(self):
+        copy_id = uuid.uuid4()
+        self.assertEqual(fast_url('renew-book-librarian', copy_id), f'/catalog/book/{copy_id}/renew/')
+
+    def test_other_argument_types_fall_back_to_reverse(self):
+        self.assertEqual(fast_url('book-detail', '7'), '/catalog/book/7')
+
+    def test_script_prefix_is_respected(self):
+        set_script_prefix('/library/')
+        self.addCleanup(set_script_prefix, '/')
+        self.assertEqual(fast_url('book-detail', 7), '/library/catalog/book/7')
+
+    @override_settings(ROOT_URLCONF='catalog.urls')
+    def test_cache_is_dropped_when_urlconf_changes(self):
+        self.assertEqual(fast_url('book-detail', 7), '/book/7')
+
+    def test_template_tag(self):
+        template = Template("{% load catalog_urls %}{% for pk in pks %}{% fast_url 'book-detail' pk %} {% endfor %}")
+        self.assertEqual(template.render(Context({'pks': [1, 2]})), '/catalog/book/1 /catalog/book/2 ')
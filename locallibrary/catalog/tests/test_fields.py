@@ -0,0 +1,39 @@
+import uuid
+
+from django.db import connection
+from django.test import TestCase
+
+from catalog.fields import uuid7
+from catalog.models import BookInstance
+
+
+class BookInstanceIdTest(TestCase):
+    def test_uuid7_is_time_ordered(self):
+        ids = [uuid7() for _ in range(1000)]
+        self.assertEqual(ids, sorted(ids))
+        self.assertTrue(all(value.version == 7 for value in ids))
+
+    def test_new_copies_get_uuid7_ids(self):
+        copy = BookInstance.objects.create(imprint='Imprint')
+        self.assertEqual(copy.id.version, 7)
+
+    def test_id_round_trips_as_uuid(self):
+        copy = BookInstance.objects.create(imprint='Imprint')
+        self.assertEqual(BookInstance.objects.get(pk=str(copy.pk)).pk, copy.pk)
+        self.assertIsInstance(BookInstance.objects.get(pk=copy.pk).pk, uuid.UUID)
+
+    def test_column_type(self):
+        field = BookInstance._meta.pk
+        self.assertEqual(field.get_internal_type(), 'BinaryField')
+        if connection.vendor == 'sqlite':
+            self.assertEqual(field.db_type(connection), 'blob')
+        else:
+            self.assertEqual(field.db_type(connection), connection.data_types['UUIDField'])
+
+    def test_id_stored_as_16_bytes_on_sqlite(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('Binary storage is specific to SQLite')
+        BookInstance.objects.create(imprint='Imprint')
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT typeof(id), length(id) FROM catalog_bookinstance")
+            self.assertEqual(cursor.fetchone(), ('blob', 16))
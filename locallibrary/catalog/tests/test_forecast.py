@@ -0,0 +1,76 @@
+import datetime
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from catalog import forecast
+from catalog.tests.factories import PASSWORD, create_book_instances, create_books, create_library
+
+TODAY = datetime.date(2026, 3, 1)
+
+
+@skipUnless(forecast.np, 'NumPy is not installed')
+@override_settings(CATALOG_FORECAST_OVERDUE_RETURN_RATE=0.5, CATALOG_FORECAST_OVERDUE_HALF_LIFE=10)
+class ForecastTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.shelved, _ = create_library(copies=2, status='a')
+        cls.returning, cls.overdue, cls.repairing = create_books(
+            3, author=cls.shelved.author, language=cls.shelved.language,
+        )
+        create_book_instances(1, book=cls.returning, status='o', due_back=TODAY + datetime.timedelta(days=5))
+        create_book_instances(1, book=cls.overdue, status='o', due_back=TODAY - datetime.timedelta(days=10))
+        create_book_instances(1, book=cls.repairing, status='m')
+
+    def row(self, result, book):
+        return list(result.book_ids).index(book.pk)
+
+    def test_expected_copies_per_day(self):
+        result = forecast.forecast(10, TODAY)
+        self.assertEqual(result.expected.shape, (4, 11))
+        self.assertEqual(list(result.expected[self.row(result, self.shelved)]), [2] * 11)
+        self.assertEqual(list(result.expected[self.row(result, self.returning)]), [0] * 5 + [1] * 6)
+        self.assertEqual(list(result.expected[self.row(result, self.repairing)]), [0] * 11)
+        # Ten days overdue halves the daily return chance to 0.25, and it keeps
+        # falling the longer the copy stays out.
+        late = result.expected[self.row(result, self.overdue)]
+        self.assertEqual(late[0], 0)
+        self.assertAlmostEqual(late[1], 0.25)
+        self.assertAlmostEqual(late[2], 1 - 0.75 * (1 - 0.5 * 0.5 ** 1.1))
+        self.assertTrue(all(late[day + 1] - late[day] < late[day] - late[day - 1] for day in range(1, 10)))
+
+    def test_shortages_scarcest_first(self):
+        result = forecast.forecast(10, TODAY)
+        short = [int(result.book_ids[i]) for i in result.shortages()]
+        self.assertEqual(short, [self.repairing.pk])
+        short = [int(result.book_ids[i]) for i in result.shortages(day=TODAY)]
+        self.assertEqual(short, [self.returning.pk, self.overdue.pk, self.repairing.pk])
+
+    def test_command_and_staff_report(self):
+        out = StringIO()
+        call_command('forecast_availability', '--days', '10', '--start', TODAY.isoformat(), stdout=out)
+        self.assertIn('5 copies of 4 books', out.getvalue())
+        self.assertIn(self.repairing.title, out.getvalue())
+
+        User.objects.create_user('staff', password=PASSWORD, is_staff=True)
+        self.client.login(username='staff', password=PASSWORD)
+        response = self.client.get(reverse('availability-forecast') + '?days=10')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, self.repairing.get_absolute_url())
+
+    def test_report_is_cached_per_day_and_horizon(self):
+        cache.clear()
+        with mock.patch.object(forecast, 'forecast', wraps=forecast.forecast) as run:
+            first = forecast.shortage_report(10, TODAY)
+            self.assertEqual(forecast.shortage_report(10, TODAY), first)
+            self.assertEqual(run.call_count, 1)
+            forecast.shortage_report(20, TODAY)
+            forecast.shortage_report(10, TODAY + datetime.timedelta(days=1))
+            self.assertEqual(run.call_count, 3)
+        self.assertEqual((first['total'], first['short']), (4, 1))
+        self.assertEqual(first['rows'], [(self.repairing.pk, 1, 0.0, 0.0)])
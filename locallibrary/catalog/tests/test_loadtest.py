@@ -0,0 +1,46 @@
+from django.test import TransactionTestCase
+
+from catalog.loadtest import LoadTest, TrafficPlan, WSGITransport, latency_summary, seed_database
+
+
+class LoadTestHarnessTest(TransactionTestCase):
+    def test_wsgi_run_reports_without_errors(self):
+        from locallibrary.wsgi import application
+
+        seed_database(authors=3, books_per_author=2, copies_per_book=2)
+        report = LoadTest(
+            WSGITransport(application, 'testserver'), TrafficPlan.from_database(),
+            concurrency=2, requests=40, seed=1, host='testserver',
+        ).run()
+
+        self.assertEqual(report['requests'], 40)
+        self.assertEqual(report['errors'], 0)
+        self.assertIn('index', report['routes'])
+        self.assertGreater(report['throughput_rps'], 0)
+        self.assertEqual(report['exceptions'], {})
+
+    def test_failed_login_counts_as_error(self):
+        from locallibrary.wsgi import application
+
+        seed_database(authors=1, books_per_author=1, copies_per_book=1)
+        plan = TrafficPlan.from_database(password='wrong password')
+        report = LoadTest(
+            WSGITransport(application, 'testserver'), plan, concurrency=1, requests=6,
+            weights={'my_books': 1}, host='testserver',
+        ).run()
+
+        # Every scenario stops at its rejected login: GET then POST, three times.
+        self.assertEqual(report['routes']['login']['requests'], 6)
+        self.assertEqual(report['routes']['login']['errors'], 3)
+        self.assertEqual(report['exceptions'], {'LoginFailed': 3})
+        self.assertNotIn('my-borrowed', report['routes'])
+
+    def test_duration_alone_sets_no_request_limit(self):
+        self.assertIsNone(LoadTest(None, None, duration=5).requests)
+        self.assertEqual(LoadTest(None, None).requests, 1000)
+
+    def test_latency_summary_percentiles(self):
+        summary = latency_summary([i / 1000 for i in range(1, 101)])
+        self.assertEqual(summary['p50'], 50.0)
+        self.assertEqual(summary['p99'], 99.0)
+        self.assertEqual(summary['max'], 100.0)
@@ -0,0 +1,65 @@
+import datetime
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from catalog.loans import loan_summary
+from catalog.models import Book, BookInstance
+
+
+class LoanSummaryTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader', password='QWEasd123!')
+        cls.book = Book.objects.create(title='Book Title', summary='Summary', isbn='ABCDEFG')
+        today = datetime.date.today()
+        for days in (-2, 3, 7):
+            BookInstance.objects.create(
+                book=cls.book, imprint='Imprint', borrower=cls.user, status='o',
+                due_back=today + datetime.timedelta(days=days),
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_summary_counts_loans(self):
+        summary = loan_summary(self.user)
+        self.assertEqual(summary['count'], 3)
+        self.assertEqual(summary['overdue'], 1)
+        self.assertEqual(summary['next_due'], datetime.date.today() - datetime.timedelta(days=2))
+
+    def test_summary_is_cached(self):
+        loan_summary(self.user)
+        with self.assertNumQueries(0):
+            loan_summary(self.user)
+
+    def test_summary_invalidated_when_copy_returned(self):
+        loan_summary(self.user)
+        copy = BookInstance.objects.filter(borrower=self.user).first()
+        copy.status = 'a'
+        copy.borrower = None
+        copy.save()
+        self.assertEqual(loan_summary(self.user)['count'], 2)
+
+    def test_summary_invalidated_for_both_borrowers_when_copy_moves(self):
+        other = User.objects.create_user(username='other', password='QWEasd123!')
+        loan_summary(self.user)
+        loan_summary(other)
+        copy = BookInstance.objects.filter(borrower=self.user).first()
+        copy.borrower = other
+        copy.save()
+        self.assertEqual(loan_summary(self.user)['count'], 2)
+        self.assertEqual(loan_summary(other)['count'], 1)
+
+    def test_loading_copies_reads_no_borrowers(self):
+        # Nothing runs per loaded copy, so deferred fields stay deferred.
+        with self.assertNumQueries(1):
+            self.assertEqual(len(BookInstance.objects.only('pk')), 3)
+
+    def test_sidebar_shows_summary(self):
+        self.client.login(username='reader', password='QWEasd123!')
+        response = self.client.get(reverse('my-borrowed'))
+        self.assertContains(response, 'On loan: 3')
+        self.assertContains(response, 'Overdue: 1')
@@ -0,0 +1,87 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.paginator import EmptyPage
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from catalog.models import Author
+from catalog.pagination import CachedCountPaginator
+from catalog.versions import require_shared_cache
+
+
+class CachedCountPaginatorTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for author_id in range(5):
+            Author.objects.create(first_name=f'First {author_id}', last_name=f'Last {author_id}')
+
+    def setUp(self):
+        # Cached counts survive the per-test rollback, so start each test cold.
+        cache.clear()
+
+    def test_count_is_cached_between_requests(self):
+        CachedCountPaginator(Author.objects.order_by('pk'), 2).count
+        with self.assertNumQueries(0):
+            paginator = CachedCountPaginator(Author.objects.order_by('pk'), 2)
+            self.assertEqual(paginator.count, 5)
+        self.assertFalse(paginator.approximate)
+
+    def test_count_is_invalidated_on_save(self):
+        self.assertEqual(CachedCountPaginator(Author.objects.order_by('pk'), 2).count, 5)
+        Author.objects.create(first_name='New', last_name='Author')
+        self.assertEqual(CachedCountPaginator(Author.objects.order_by('pk'), 2).count, 6)
+
+    def test_filtered_querysets_are_cached_separately(self):
+        self.assertEqual(CachedCountPaginator(Author.objects.order_by('pk'), 2).count, 5)
+        filtered = Author.objects.filter(last_name='Last 1').order_by('pk')
+        self.assertEqual(CachedCountPaginator(filtered, 2).count, 1)
+
+    def test_estimate_used_above_threshold(self):
+        with self.settings(CATALOG_COUNT_ESTIMATE_THRESHOLD=1000), \
+                mock.patch.object(CachedCountPaginator, 'estimate_count', return_value=5000):
+            Author.objects.create(first_name='Fresh', last_name='Version')
+            paginator = CachedCountPaginator(Author.objects.order_by('pk'), 2)
+            self.assertEqual(paginator.count, 5000)
+            self.assertTrue(paginator.approximate)
+
+    def test_pages_are_checked_against_an_exact_count_near_the_estimated_end(self):
+        with self.settings(CATALOG_COUNT_ESTIMATE_THRESHOLD=3), \
+                mock.patch.object(CachedCountPaginator, 'estimate_count', return_value=3):
+            Author.objects.create(first_name='Fresh', last_name='Version')
+            paginator = CachedCountPaginator(Author.objects.order_by('pk'), 2)
+            self.assertEqual(len(paginator.page(1)), 2)
+            self.assertTrue(paginator.approximate)
+            # The estimate says two pages; there are three.
+            self.assertTrue(paginator.page(2).has_next())
+            self.assertEqual(len(paginator.page(3)), 2)
+            self.assertEqual((paginator.count, paginator.approximate), (6, False))
+            self.assertEqual(CachedCountPaginator(Author.objects.order_by('pk'), 2).count, 6)
+
+    def test_empty_page_inside_a_high_estimate_is_not_served(self):
+        with self.settings(CATALOG_COUNT_ESTIMATE_THRESHOLD=1000), \
+                mock.patch.object(CachedCountPaginator, 'estimate_count', return_value=5000):
+            Author.objects.create(first_name='Fresh', last_name='Version')
+            paginator = CachedCountPaginator(Author.objects.order_by('pk'), 2)
+            with self.assertRaises(EmptyPage):
+                paginator.page(10)
+            self.assertEqual(paginator.num_pages, 3)
+            self.assertEqual(self.client.get(reverse('authors'), {'page': 10}).status_code, 404)
+
+    def test_list_view_renders_about_for_estimates(self):
+        with self.settings(CATALOG_COUNT_ESTIMATE_THRESHOLD=1000), \
+                mock.patch.object(CachedCountPaginator, 'estimate_count', return_value=5000):
+            Author.objects.bulk_create(Author(first_name='More', last_name=str(i)) for i in range(5))
+            Author.objects.create(first_name='Fresh', last_name='Version')
+            response = self.client.get(reverse('authors'))
+        self.assertContains(response, 'Page 1 of about 500.')
+        self.assertContains(response, 'about 5000 results')
+
+
+class SharedCacheTest(SimpleTestCase):
+    def test_per_process_cache_is_refused(self):
+        require_shared_cache()
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            with self.assertRaises(ImproperlyConfigured):
+                require_shared_cache()
@@ -0,0 +1,66 @@
+from django.contrib.auth.models import Group, Permission, User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from catalog.permissions import CachedModelBackend
+from catalog.tests.factories import PASSWORD, create_library, create_users
+
+
+class CachedPermissionTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        _, cls.copies = create_library(copies=3, status='o')
+        cls.librarian, = create_users('librarian', permissions=['can_mark_returned'])
+        cls.helper, = create_users('helper')
+        cls.group = Group.objects.create(name='Librarians')
+
+    def setUp(self):
+        cache.clear()
+
+    def permission_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        return response, [query['sql'] for query in queries if 'auth_permission' in query['sql']]
+
+    def test_warm_staff_request_checks_permissions_without_queries(self):
+        self.client.login(username='librarian', password=PASSWORD)
+        response, cold = self.permission_queries(reverse('all-borrowed'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(cold), 2)
+        # A new request gets a new user object, so this is the shared cache at work.
+        response, warm = self.permission_queries(reverse('all-borrowed'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(warm, [])
+        # Session, user, the copy and its book; the decorator and the sidebar's
+        # perms checks are answered from the cache.
+        url = reverse('renew-book-librarian', args=[self.copies[0].pk])
+        self.client.get(url)
+        with self.assertNumQueries(4):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_group_permission_change_applies_to_next_request(self):
+        self.client.login(username='helper', password=PASSWORD)
+        self.helper.groups.add(self.group)
+        self.assertEqual(self.client.get(reverse('all-borrowed')).status_code, 403)
+        self.group.permissions.add(Permission.objects.get(codename='can_mark_returned'))
+        self.assertEqual(self.client.get(reverse('all-borrowed')).status_code, 200)
+        self.group.user_set.remove(self.helper)
+        self.assertEqual(self.client.get(reverse('all-borrowed')).status_code, 403)
+
+    def test_user_permission_and_status_changes_apply_to_next_request(self):
+        self.client.login(username='librarian', password=PASSWORD)
+        self.assertEqual(self.client.get(reverse('all-borrowed')).status_code, 200)
+        self.librarian.user_permissions.clear()
+        self.assertEqual(self.client.get(reverse('all-borrowed')).status_code, 403)
+        User.objects.filter(pk=self.librarian.pk).update(is_superuser=True)
+        User.objects.get(pk=self.librarian.pk).save()
+        self.assertEqual(self.client.get(reverse('all-borrowed')).status_code, 200)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_refuses_per_process_cache(self):
+        with self.assertRaises(ImproperlyConfigured):
+            CachedModelBackend()
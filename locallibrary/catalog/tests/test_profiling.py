@@ -0,0 +1,63 @@
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from catalog import profiling
+
+
+class ProfilingMiddlewareTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(username='staff', password='QWEasd123!', is_staff=True)
+        cls.reader = User.objects.create_user(username='reader', password='QWEasd123!')
+
+    def setUp(self):
+        self.profile_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.profile_dir)
+        settings_override = override_settings(CATALOG_PROFILE_DIR=self.profile_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_untriggered_request_is_not_profiled(self):
+        self.client.login(username='staff', password='QWEasd123!')
+        response = self.client.get(reverse('authors'))
+        self.assertNotIn('X-Catalog-Profile', response)
+        self.assertEqual(profiling.recent_profiles(), [])
+
+    def test_signed_token_profiles_staff_request(self):
+        self.client.login(username='staff', password='QWEasd123!')
+        token = profiling.make_token(self.staff)
+        response = self.client.get(reverse('authors'), {profiling.PROFILE_PARAM: token})
+        self.assertTrue(response['X-Catalog-Profile'].endswith('.prof'))
+        profiles = profiling.recent_profiles()
+        self.assertEqual(len(profiles), 1)
+        self.assertTrue(profiles[0]['top'])
+
+    def test_sampling_mode_via_header(self):
+        self.client.login(username='staff', password='QWEasd123!')
+        token = profiling.make_token(self.staff, 'sample')
+        response = self.client.get(reverse('authors'), HTTP_X_CATALOG_PROFILE=token)
+        self.assertTrue(response['X-Catalog-Profile'].endswith('.collapsed'))
+
+    def test_token_is_ignored_for_other_users(self):
+        self.client.login(username='reader', password='QWEasd123!')
+        token = profiling.make_token(self.staff)
+        response = self.client.get(reverse('authors'), {profiling.PROFILE_PARAM: token})
+        self.assertNotIn('X-Catalog-Profile', response)
+
+    def test_tampered_token_is_ignored(self):
+        self.client.login(username='staff', password='QWEasd123!')
+        token = profiling.make_token(self.staff) + 'x'
+        response = self.client.get(reverse('authors'), {profiling.PROFILE_PARAM: token})
+        self.assertNotIn('X-Catalog-Profile', response)
+
+    def test_profile_list_is_staff_only(self):
+        self.client.login(username='reader', password='QWEasd123!')
+        self.assertEqual(self.client.get(reverse('profiles')).status_code, 302)
+        self.client.login(username='staff', password='QWEasd123!')
+        response = self.client.get(reverse('profiles'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'catalog/profile_list.html')
@@ -0,0 +1,80 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from catalog.deletion import chunked_delete
+from catalog.models import Author, Book, BookInstance, CatalogEntry, Genre, Language
+from catalog.projection import refresh_entries
+from catalog.tests.factories import create_book_instances, create_library
+from catalog.versions import get_version
+
+
+class CatalogEntryTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.book, self.copies = create_library(copies=3, status='a')
+
+    def entry(self):
+        return CatalogEntry.objects.get(book=self.book)
+
+    def test_entry_flattens_book(self):
+        entry = self.entry()
+        self.assertEqual(
+            (entry.title, entry.url, entry.author_name, entry.language, entry.genres, entry.copies, entry.available),
+            ('Book Title', self.book.get_absolute_url(), 'Smith, John', 'English', 'Fantasy', 3, 3),
+        )
+
+    def test_copy_changes_update_counts(self):
+        version = get_version(CatalogEntry)
+        copy = BookInstance.objects.get(pk=self.copies[0].pk)
+        copy.status = 'o'
+        copy.save()
+        BookInstance.objects.get(pk=self.copies[1].pk).delete()
+        self.assertEqual((self.entry().copies, self.entry().available), (2, 1))
+        # Only the counts changed, so nothing keyed on the version is dropped.
+        self.assertEqual(get_version(CatalogEntry), version)
+        Book.objects.filter(pk=self.book.pk).update(title='Renamed')
+        refresh_entries([self.book.pk])
+        self.assertNotEqual(get_version(CatalogEntry), version)
+
+    def test_author_language_and_genre_changes_are_copied(self):
+        author = Author.objects.get(pk=self.book.author_id)
+        author.last_name = 'Smythe'
+        author.save()
+        Genre.objects.create(name='History').book_set.add(self.book)
+        Genre.objects.get(name='Fantasy').delete()
+        Language.objects.get(pk=self.book.language_id).delete()
+        entry = self.entry()
+        self.assertEqual((entry.author_name, entry.genres, entry.language, entry.language_pk),
+                         ('Smythe, John', 'History', '', None))
+
+    def test_deleted_author_is_cleared_in_chunks_too(self):
+        chunked_delete(Author.objects.get(pk=self.book.author_id), pause=0)
+        self.assertEqual((self.entry().author_pk, self.entry().author_name), (None, ''))
+        Book.objects.get(pk=self.book.pk).delete()
+        self.assertFalse(CatalogEntry.objects.exists())
+
+    def test_rebuild_command_restores_entries(self):
+        CatalogEntry.objects.all().delete()
+        call_command('rebuild_catalog_projection', stdout=StringIO())
+        self.assertEqual(self.entry().copies, 3)
+
+
+@override_settings(CATALOG_LIST_FROM_PROJECTION=True)
+class ProjectionListTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.book, _ = create_library()
+        create_book_instances(2, book=self.book, status='a')
+
+    def test_book_list_reads_only_catalog_entries(self):
+        self.client.get(reverse('books'))
+        # Two MAX(updated_at) lookups for the conditional GET validators, then
+        # one page of entries; the count is cached by the first request.
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('books'))
+        self.assertTemplateUsed(response, 'catalog/catalogentry_list.html')
+        self.assertContains(response, '2 of 2 available')
@@ -0,0 +1,64 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from catalog.startup import package_totals, parse_importtime
+from catalog.testing import cache_settings
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     django.utils.regex_helper
+import time:       300 |        420 |   django.contrib.auth.views
+import time:        80 |        500 | catalog.forms
+"""
+
+
+class ImportTimeTest(SimpleTestCase):
+    def test_parses_rows_and_depth(self):
+        self.assertEqual(parse_importtime(IMPORTTIME), [
+            ('django.utils.regex_helper', 120, 120, 2),
+            ('django.contrib.auth.views', 300, 420, 1),
+            ('catalog.forms', 80, 500, 0),
+        ])
+
+    def test_groups_contrib_apps_and_catalog_modules(self):
+        self.assertEqual(package_totals(parse_importtime(IMPORTTIME)), [
+            ('django.contrib.auth', 300), ('django', 120), ('catalog.forms', 80),
+        ])
+
+
+class SlimWorkerTest(SimpleTestCase):
+    def test_public_routes_do_not_load_edit_views_or_admin(self):
+        script = (
+            "import json, sys, locallibrary.wsgi\n"
+            "from django.urls import resolve, Resolver404\n"
+            "resolve('/catalog/books/'); resolve('/catalog/book/create/')\n"
+            "try:\n    resolve('/admin/'); admin = True\n"
+            "except Resolver404:\n    admin = False\n"
+            "print(json.dumps({'admin': admin, 'modules': sorted(m for m in sys.modules if m.startswith('catalog.'))}))\n"
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            # The worker preloads from the database at import, so give it an
+            # empty one and this run's cache rather than the development ones.
+            Path(tmp, 'worker_settings.py').write_text(
+                'from locallibrary.settings import *  # noqa\n'
+                f"DATABASES['default']['NAME'] = {str(Path(tmp) / 'db.sqlite3')!r}\n"
+                f"CACHES = {cache_settings(str(Path(tmp) / 'cache'))!r}\n"
+            )
+            env = {
+                **os.environ, 'CATALOG_SLIM_APPS': '1', 'DJANGO_SETTINGS_MODULE': 'worker_settings',
+                'PYTHONPATH': os.pathsep.join([tmp, str(settings.BASE_DIR)]),
+            }
+            result = subprocess.run([sys.executable, '-c', script], cwd=settings.BASE_DIR, env=env,
+                                    capture_output=True, text=True, check=True)
+        report = json.loads(result.stdout)
+        self.assertFalse(report['admin'])
+        self.assertIn('catalog.views', report['modules'])
+        for module in ('catalog.edit_views', 'catalog.forms', 'catalog.autocomplete', 'catalog.tasks'):
+            self.assertNotIn(module, report['modules'])
@@ -0,0 +1,130 @@
+import datetime
+import time
+
+from django.contrib.auth.models import User, Permission
+from django.core import mail
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from catalog import tasks
+from catalog.models import Book, BookInstance, Task
+
+calls = []
+
+
+@tasks.task('test.record')
+def record(value):
+    calls.append(value)
+
+
+@tasks.task('test.explode')
+def explode():
+    raise RuntimeError('boom')
+
+
+@override_settings(CATALOG_TASK_RETRY_DELAY=0)
+class TaskQueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_unknown_task(self):
+        with self.assertRaises(ValueError):
+            tasks.enqueue('test.missing')
+
+    def test_idempotency_key_returns_existing_task(self):
+        first = tasks.enqueue('test.record', {'value': 1}, idempotency_key='once')
+        second = tasks.enqueue('test.record', {'value': 2}, idempotency_key='once')
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_idempotency_key_does_not_repeat_finished_task(self):
+        tasks.enqueue('test.record', {'value': 1}, idempotency_key='once')
+        tasks.work(burst=True)
+        again = tasks.enqueue('test.record', {'value': 2}, idempotency_key='once')
+        self.assertEqual(again.status, Task.DONE)
+        self.assertEqual(tasks.work(burst=True), 0)
+        self.assertEqual(calls, [1])
+
+    def test_retry_requeues_finished_task(self):
+        first = tasks.enqueue('test.record', {'value': 1}, idempotency_key='once')
+        tasks.work(burst=True)
+        second = tasks.enqueue('test.record', {'value': 2}, idempotency_key='once', retry=True)
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual((second.status, second.attempts, second.payload), (Task.QUEUED, 0, {'value': 2}))
+        tasks.work(burst=True)
+        self.assertEqual(calls, [1, 2])
+
+    def test_work_runs_queued_tasks(self):
+        tasks.enqueue('test.record', {'value': 1})
+        tasks.enqueue('test.record', {'value': 2})
+        self.assertEqual(tasks.work(burst=True), 2)
+        self.assertEqual(calls, [1, 2])
+        self.assertEqual(Task.objects.filter(status=Task.DONE).count(), 2)
+        self.assertEqual(tasks.task_stats()['test.record']['done'], 2)
+
+    def test_failures_are_retried_then_marked_failed(self):
+        task = tasks.enqueue('test.explode', max_attempts=2)
+        tasks.work(burst=True)
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.FAILED)
+        self.assertEqual(task.attempts, 2)
+        self.assertIn('boom', task.last_error)
+
+    def test_delayed_tasks_wait(self):
+        tasks.enqueue('test.record', {'value': 1}, delay=60)
+        self.assertEqual(tasks.work(burst=True), 0)
+
+    def test_stale_tasks_are_requeued_until_out_of_attempts(self):
+        task = tasks.enqueue('test.record', {'value': 1}, max_attempts=2)
+        long_ago = timezone.now() - datetime.timedelta(hours=1)
+        for attempts, status in [(1, Task.QUEUED), (2, Task.FAILED)]:
+            tasks.claim_next()
+            Task.objects.filter(pk=task.pk).update(started=long_ago)
+            tasks.requeue_stale()
+            task.refresh_from_db()
+            self.assertEqual((task.attempts, task.status), (attempts, status))
+        self.assertEqual(tasks.work(burst=True), 0)
+
+    def test_recent_heartbeat_is_not_requeued(self):
+        tasks.enqueue('test.record', {'value': 1})
+        task = tasks.claim_next()
+        self.assertEqual(tasks.requeue_stale(), 0)
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.RUNNING)
+
+
+@tasks.task('test.wait')
+def wait(seconds):
+    time.sleep(seconds)
+
+
+@override_settings(CATALOG_TASK_HEARTBEAT=0.05)
+class HeartbeatTest(TransactionTestCase):
+    def test_long_task_keeps_its_claim(self):
+        tasks.enqueue('test.wait', {'seconds': 0.3})
+        task = tasks.claim_next()
+        claimed = task.started
+        tasks.run_task(task)
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.DONE)
+        self.assertGreater(task.started, claimed)
+
+
+class RenewalNotificationTest(TestCase):
+    def test_renewal_enqueues_notification(self):
+        librarian = User.objects.create_user(username='librarian', password='QWEasd123!')
+        librarian.user_permissions.add(Permission.objects.get(codename='can_mark_returned'))
+        reader = User.objects.create_user(username='reader', password='QWEasd123!', email='reader@example.com')
+        book = Book.objects.create(title='Book Title', summary='Summary', isbn='ABCDEFG')
+        copy = BookInstance.objects.create(book=book, imprint='Imprint', borrower=reader, status='o',
+                                           due_back=datetime.date.today())
+
+        self.client.login(username='librarian', password='QWEasd123!')
+        renewal_date = datetime.date.today() + datetime.timedelta(weeks=2)
+        self.client.post(reverse('renew-book-librarian', kwargs={'pk': copy.pk}), {'renewal_date': renewal_date})
+
+        self.assertEqual(len(mail.outbox), 0)
+        tasks.work(burst=True)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['reader@example.com'])
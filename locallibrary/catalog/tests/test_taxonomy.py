@@ -0,0 +1,71 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from catalog import taxonomy
+from catalog.forms import BookForm
+from catalog.models import Language
+from catalog.tests.factories import PASSWORD, create_books, create_genres, create_library
+
+
+class TaxonomyTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.book, _ = create_library()
+        cls.genres = create_genres('Poetry', 'Drama')
+
+    def setUp(self):
+        cache.clear()
+
+    def assertNoTaxonomyQueries(self, queries):
+        tables = [query['sql'] for query in queries if '"catalog_genre"' in query['sql']
+                  or '"catalog_language"' in query['sql']]
+        self.assertEqual(tables, [])
+
+    def test_lookups_by_id_and_name(self):
+        language = self.book.language
+        self.assertEqual(taxonomy.languages.get(language.pk), language)
+        self.assertEqual(taxonomy.languages.get_by_name('ENGLISH'), language)
+        self.assertIsNone(taxonomy.languages.get_by_name('Klingon'))
+        self.assertEqual([genre.name for genre in taxonomy.genres.all()], ['Fantasy', 'Poetry', 'Drama'])
+
+    def test_reloads_after_change_signal(self):
+        taxonomy.languages.refresh()
+        Language.objects.create(name='French')
+        self.assertEqual(taxonomy.languages.get_by_name('french').name, 'French')
+
+    def test_attach_fills_language_and_genres(self):
+        books = create_books(2, genres=self.genres, author=self.book.author, language=self.book.language)
+        taxonomy.preload()
+        with CaptureQueriesContext(connection) as queries:
+            books = taxonomy.attach(books)
+            self.assertEqual(books[0].language.name, 'English')
+            self.assertEqual(books[1].display_genre(), 'Poetry, Drama')
+        self.assertEqual(len(queries), 1)
+
+    def test_book_detail_and_form_read_from_registry(self):
+        taxonomy.preload()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.book.get_absolute_url())
+            form = BookForm(instance=taxonomy.attach([self.book])[0], data={
+                'title': 'New title', 'author': self.book.author_id, 'summary': 'Summary', 'isbn': '123',
+                'language': self.book.language_id, 'genre': [genre.pk for genre in self.genres],
+            })
+            self.assertTrue(form.is_valid(), form.errors)
+            form.as_p()
+        self.assertContains(response, 'Fantasy')
+        self.assertNoTaxonomyQueries(queries)
+
+    def test_admin_book_list_reads_genres_from_registry(self):
+        User.objects.create_superuser(username='admin', password=PASSWORD)
+        self.client.login(username='admin', password=PASSWORD)
+        taxonomy.preload()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('admin:catalog_book_changelist'))
+        self.assertContains(response, 'Fantasy')
+        self.assertNoTaxonomyQueries(queries)
+        response = self.client.get(reverse('admin:catalog_book_change', args=[self.book.pk]))
+        self.assertContains(response, f'<option value="{self.book.language_id}" selected>English</option>')
@@ -4,18 +4,22 @@ from django.contrib.auth.models import User, Permission
 from django.contrib.auth.mixins import LoginRequiredMixin
 from catalog.models import Author, Book, BookInstance, Genre, Language
 import datetime
+from unittest import mock
 from django.utils import timezone
 from django.views import generic
 
+from catalog.views import AllBorrowedBooksListView
+from catalog.tests.factories import create_authors, create_library, create_users
+
 class AuthorListViewTest(TestCase):
     @classmethod
     def setUpTestData(cls):
         number_of_authors = 13
-        for author_id in range(number_of_authors):
-            Author.objects.create(
-                first_name=f'Christian {author_id}',
-                last_name=f'Surname {author_id}',
-            )
+        create_authors(
+            number_of_authors,
+            first_name=lambda author_id: f'Christian {author_id}',
+            last_name=lambda author_id: f'Surname {author_id}',
+        )
 
     def test_view_url_exists_at_desired_location(self):
         response = self.client.get('/catalog/authors/')
@@ -51,39 +55,18 @@ class LoanedBooksByUserListView(LoginRequiredMixin, generic.ListView):
 
 
 class LoanedBookInstancesByUserListViewTest(TestCase):
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
 
-        test_user1 = User.objects.create_user(username='testuser1', password='QWEasd123!')
-        test_user2 = User.objects.create_user(username='testuser2', password='QWEasd123!')
-        test_user1.save()
-        test_user2.save()
-
-        test_author = Author.objects.create(first_name='John', last_name='Smith')
-        test_genre = Genre.objects.create(name='Fantasy')
-        test_language = Language.objects.create(name='English')
-        test_book = Book.objects.create(
-            title='Book Title',
-            summary='My book summary',
-            isbn='ABCDEFG',
-            author=test_author,
-            language=test_language,
-        )
-        genre_objects_for_book = Genre.objects.all()
-        test_book.genre.set(genre_objects_for_book)
-        test_book.save()
+        test_user1, test_user2 = create_users('testuser1', 'testuser2')
 
         number_of_book_copies = 30
-        for book_copy in range(number_of_book_copies):
-            return_date = timezone.now() + datetime.timedelta(days=book_copy % 5)
-            the_borrower = test_user1 if book_copy % 2 else test_user2
-            status = 'm'  
-            BookInstance.objects.create(
-                book=test_book,
-                imprint='Unlikely Imprint, 2016',
-                due_back=return_date,
-                borrower=the_borrower,
-                status=status,
-            )
+        create_library(
+            copies=number_of_book_copies,
+            due_back=lambda book_copy: timezone.now() + datetime.timedelta(days=book_copy % 5),
+            borrower=lambda book_copy: test_user1 if book_copy % 2 else test_user2,
+            status='m',
+        )
 
     def test_redirect_if_not_logged_in(self):
 
@@ -142,47 +125,63 @@ class LoanedBookInstancesByUserListViewTest(TestCase):
                 self.assertTrue(last_date <= copy.due_back)
 
 
-class RenewBookInstancesViewTest(TestCase):
-    def setUp(self):
-        test_user1 = User.objects.create_user(username='testuser1', password='QWEasd123!')
-        test_user2 = User.objects.create_user(username='testuser2', password='QWEasd123!')
-        test_user1.save()
-        test_user2.save()
-
-
-        permission = Permission.objects.get(name='Set book as returned')
-        test_user2.user_permissions.add(permission)
-        test_user2.save()
-
-
-        test_author = Author.objects.create(first_name='John', last_name='Smith')
-        test_genre = Genre.objects.create(name='Fantasy')
-        test_language = Language.objects.create(name='English')
-        test_book = Book.objects.create(
-            title='Book Title',
-            summary='My book summary',
-            isbn='ABCDEFG',
-            author=test_author,
-            language=test_language,
+class AllBorrowedBooksReportTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        librarian, = create_users('librarian', permissions=['can_mark_returned'])
+        create_library(
+            copies=25,
+            due_back=lambda book_copy: datetime.date.today() + datetime.timedelta(days=book_copy),
+            borrower=librarian,
+            status='o',
         )
-        genre_objects_for_book = Genre.objects.all()
-        test_book.genre.set(genre_objects_for_book)
-        test_book.save()
 
-        return_date = datetime.date.today() + datetime.timedelta(days=5)
-        self.test_bookinstance1 = BookInstance.objects.create(
-            book=test_book,
-            imprint='Unlikely Imprint, 2016',
-            due_back=return_date,
-            borrower=test_user1,
-            status='o', 
-        )
+    def setUp(self):
+        self.client.login(username='librarian', password='QWEasd123!')
+
+    def test_page_links_to_full_report(self):
+        resp = self.client.get(reverse('all-borrowed'))
+        self.assertEqual(len(resp.context['bookinstance_list']), 10)
+        self.assertContains(resp, '?full=1')
+
+    def test_full_report_streams_every_loan_in_one_query(self):
+        self.client.get(reverse('all-borrowed'))
+        resp = self.client.get(reverse('all-borrowed') + '?full=1')
+        self.assertTrue(resp.streaming)
+        # Reading the body runs one query, with books and borrowers joined.
+        with self.assertNumQueries(1):
+            content = b''.join(resp.streaming_content).decode()
+        self.assertEqual(content.count('Renew</a>'), 25)
+        self.assertIn('All Borrowed Books', content)
+        self.assertTrue(content.rstrip().endswith('</html>'))
+
+    async def test_full_report_streams_under_asgi(self):
+        await self.async_client.alogin(username='librarian', password='QWEasd123!')
+        resp = await self.async_client.get(reverse('all-borrowed') + '?full=1')
+        self.assertTrue(resp.is_async)
+        parts = aiter(resp.streaming_content)
+        # The page head goes out before the loans are read.
+        with mock.patch.object(AllBorrowedBooksListView, 'get_queryset', autospec=True,
+                               side_effect=AllBorrowedBooksListView.get_queryset) as get_queryset:
+            content = (await anext(parts)).decode()
+            get_queryset.assert_not_called()
+            content += b''.join([part async for part in parts]).decode()
+        get_queryset.assert_called_once()
+        self.assertEqual(content.count('Renew</a>'), 25)
+        self.assertTrue(content.rstrip().endswith('</html>'))
+
+
+class RenewBookInstancesViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        test_user1, = create_users('testuser1')
+        test_user2, = create_users('testuser2', permissions=['can_mark_returned'])
 
-        self.test_bookinstance2 = BookInstance.objects.create(
-            book=test_book,
-            imprint='Unlikely Imprint, 2016',
+        return_date = datetime.date.today() + datetime.timedelta(days=5)
+        test_book, (cls.test_bookinstance1, cls.test_bookinstance2) = create_library(
+            copies=2,
             due_back=return_date,
-            borrower=test_user2,
+            borrower=lambda copy: [test_user1, test_user2][copy],
             status='o',
         )
 
@@ -268,14 +267,9 @@ class RenewBookInstancesViewTest(TestCase):
 
 
 class AuthorCreateViewTest(TestCase):
-    def setUp(self):
-
-        self.test_user = User.objects.create_user(
-            username='testuser', password='QWEasd123!'
-        )
-        permission = Permission.objects.get(name='Set book as returned')
-        self.test_user.user_permissions.add(permission)
-        self.test_user.save()
+    @classmethod
+    def setUpTestData(cls):
+        cls.test_user, = create_users('testuser', permissions=['can_mark_returned'])
 
     def test_redirect_if_not_logged_in(self):
         response = self.client.get(reverse('author-create'))
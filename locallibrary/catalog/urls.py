@@ -1,21 +1,51 @@
 from django.urls import path
+from django.utils.module_loading import import_string
 from . import views
 
+
+def lazy_view(dotted_path, **initkwargs):
+    """
+    Returns a view that imports ``dotted_path`` on its first request. Rarely used
+    views then stay out of worker startup, together with what only they import:
+    the task queue and NumPy (for the forecast). The forms they use are loaded at
+    startup anyway by the admin, unless CATALOG_SLIM_APPS leaves it out.
+    """
+    view = None
+
+    def lazy(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            target = import_string(dotted_path)
+            view = target.as_view(**initkwargs) if isinstance(target, type) else target
+        return view(request, *args, **kwargs)
+
+    lazy.__module__, lazy.__name__ = dotted_path.rsplit('.', 1)
+    lazy.__qualname__ = lazy.__name__
+    return lazy
+
+
 urlpatterns = [
     path('', views.index, name='index'),
     path('books/', views.BookListView.as_view(), name='books'),
     path('book/<int:pk>', views.BookDetailView.as_view(), name='book-detail'),
     path('authors/', views.AuthorListView.as_view(), name='authors'),
     path('author/<int:pk>', views.AuthorDetailView.as_view(), name='author-detail'),
-    path('author/<int:pk>/update', views.AuthorUpdateView.as_view(), name='author-update'),
+    path('author/<int:pk>/update', lazy_view('catalog.edit_views.AuthorUpdateView'), name='author-update'),
     path('mybooks/', views.LoanedBooksByUserListView.as_view(), name='my-borrowed'),
     path('borrowed/', views.AllBorrowedBooksListView.as_view(), name='all-borrowed'),
-    path('book/<uuid:pk>/renew/', views.renew_book_librarian, name='renew-book-librarian'),
-    path('author/create/', views.AuthorCreate.as_view(), name='author_create'),
-    path('author/<int:pk>/update/', views.AuthorUpdate.as_view(), name='author_update'),
-    path('author/<int:pk>/delete/', views.AuthorDelete.as_view(), name='author_delete'),
-    path('book/create/', views.BookCreate.as_view(), name='book_create'),
-    path('book/<int:pk>/update/', views.BookUpdate.as_view(), name='book_update'),
-    path('book/<int:pk>/delete/', views.BookDelete.as_view(), name='book_delete'),
+    path('book/<uuid:pk>/renew/', lazy_view('catalog.edit_views.renew_book_librarian'), name='renew-book-librarian'),
+    path('author/create/', lazy_view('catalog.edit_views.AuthorCreate'), name='author_create'),
+    path('author/<int:pk>/update/', lazy_view('catalog.edit_views.AuthorUpdate'), name='author_update'),
+    path('author/<int:pk>/delete/', lazy_view('catalog.edit_views.AuthorDelete'), name='author_delete'),
+    path('book/create/', lazy_view('catalog.edit_views.BookCreate'), name='book_create'),
+    path('book/<int:pk>/update/', lazy_view('catalog.edit_views.BookUpdate'), name='book_update'),
+    path('book/<int:pk>/delete/', lazy_view('catalog.edit_views.BookDelete'), name='book_delete'),
+    path('authors/batch/', lazy_view('catalog.edit_views.AuthorBatch'), name='author-batch'),
+    path('books/batch/', lazy_view('catalog.edit_views.BookBatch'), name='book-batch'),
+    path('copies/batch/', lazy_view('catalog.edit_views.BookInstanceBatch'), name='bookinstance-batch'),
+    path('deletion/<str:model>/<int:pk>/', lazy_view('catalog.edit_views.deletion_progress'), name='deletion-progress'),
+    path('autocomplete/<str:kind>/', lazy_view('catalog.edit_views.autocomplete'), name='autocomplete'),
+    path('forecast/', lazy_view('catalog.edit_views.availability_forecast'), name='availability-forecast'),
+    path('profiles/', lazy_view('catalog.edit_views.profile_list'), name='profiles'),
+    path('profiles/<str:name>', lazy_view('catalog.edit_views.profile_download'), name='profile-download'),
 ]
-
@@ -0,0 +1,58 @@
+"""
+Per-model data versions, kept in the default cache.
+
+Cached counts, permission sets, ETags and the in-process registries are keyed
+on these versions, which a change in any process (a web worker or the task
+worker) moves on; loan summaries and a user's permission entries are deleted
+from the cache directly. Either way only works if every
+process sees the same cache, so ``require_shared_cache()`` refuses the
+per-process backends.
+"""
+import time
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+
+
+def version_key(model):
+    return f'catalog:version:{model._meta.label_lower}'
+
+
+def require_shared_cache():
+    """
+    Raises ImproperlyConfigured if the default cache lives inside one process.
+    """
+    if isinstance(caches['default'], (LocMemCache, DummyCache)):
+        raise ImproperlyConfigured(
+            'The catalog needs a cache shared by all of its processes (e.g. FileBasedCache or '
+            'RedisCache); with a per-process cache, changes made in one worker would not '
+            'invalidate what the others have cached.'
+        )
+
+
+def new_version():
+    # Versions come from the clock rather than counting up from 1, so a cleared
+    # or evicted cache never hands out a version a worker or browser has already
+    # seen.
+    return time.time_ns()
+
+
+def get_version(model):
+    """
+    Returns the current data version of a model, as stored in the shared cache.
+    """
+    return cache.get_or_set(version_key(model), new_version, timeout=None)
+
+
+def bump_version(model):
+    """
+    Invalidates everything cached against the model by moving it to a new version.
+    """
+    # A fresh value rather than incr(): shared caches such as the file cache
+    # increment with a read and a write, so two concurrent bumps could both
+    # write the same number and one of them would invalidate nothing.
+    version = new_version()
+    cache.set(version_key(model), version, timeout=None)
+    return version
@@ -14,3 +14,13 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'locallibrary.settings')
 
 application = get_asgi_application()
+
+# Load the genre and language registries now rather than on the first request.
+# Requests open their own connections, so close the one the preload used rather
+# than leave it open for the life of the process.
+from django.db import connections  # noqa: E402
+
+from catalog.taxonomy import preload  # noqa: E402
+
+preload()
+connections.close_all()
@@ -42,12 +42,22 @@ INSTALLED_APPS = [
     
 ]
 
+# Public web workers can start with CATALOG_SLIM_APPS=1 to skip the admin and
+# static file apps (static files are served by the web server in production).
+# /admin/ is then only routed by workers started without it.
+CATALOG_SLIM_APPS = os.environ.get('CATALOG_SLIM_APPS') == '1'
+if CATALOG_SLIM_APPS:
+    INSTALLED_APPS = [
+        app for app in INSTALLED_APPS if app not in ('django.contrib.admin', 'django.contrib.staticfiles')
+    ]
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'catalog.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -66,6 +76,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'catalog.context_processors.loan_summary',
             ],
         },
     },
@@ -85,6 +96,28 @@ DATABASES = {
 }
 
 
+# Cache versions, counts, loan summaries and permission sets have to be seen by
+# every web worker and by the task worker, so the cache must be shared between
+# processes; the catalog app refuses to start on a per-process cache (see
+# catalog/versions.py). The file cache is shared by the processes of one host.
+# Set CATALOG_REDIS_URL (needs redis-py) when workers run on several hosts.
+if os.environ.get('CATALOG_REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['CATALOG_REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': BASE_DIR / '.cache',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -121,4 +154,57 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_REDIRECT_URL = '/'
 
-
+# Paginated catalog lists and admin changelists cache their counts for this many
+# seconds, and switch to planner estimates for unfiltered tables above the threshold.
+CATALOG_COUNT_CACHE_TIMEOUT = 30
+CATALOG_COUNT_ESTIMATE_THRESHOLD = 100000
+
+# Staff can profile single requests with a signed token (see /catalog/profiles/).
+CATALOG_PROFILE_DIR = BASE_DIR / 'profiles'
+CATALOG_PROFILE_TOKEN_MAX_AGE = 60 * 60
+
+# Mail goes to the console until a real backend is configured.
+EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+
+# Background tasks (manage.py run_catalog_worker): base retry delay in seconds,
+# doubled on every attempt, how often a running task reports that its worker is
+# alive, and how long without a report before the task is requeued.
+CATALOG_TASK_RETRY_DELAY = 5
+CATALOG_TASK_HEARTBEAT = 60
+CATALOG_TASK_TIMEOUT = 15 * 60
+
+# Authors and books with more dependents than this are deleted in the background,
+# CATALOG_DELETE_CHUNK_SIZE rows per transaction with a pause between chunks.
+CATALOG_CHUNKED_DELETE_THRESHOLD = 1000
+CATALOG_DELETE_CHUNK_SIZE = 500
+CATALOG_DELETE_CHUNK_PAUSE = 0.05
+
+# max-age sent with Cache-Control: public on anonymous book and author pages.
+CATALOG_PUBLIC_MAX_AGE = 60
+
+# Tests restore a migrated SQLite snapshot instead of migrating on every run
+# (see catalog/testing.py). Snapshots are rebuilt when a migration changes.
+TEST_RUNNER = 'catalog.testing.SnapshotTestRunner'
+CATALOG_TEST_SNAPSHOT_DIR = BASE_DIR / '.test-snapshots'
+
+# manage.py startup_profile --check fails when the median time from launching a
+# worker to its first response is over this many milliseconds.
+CATALOG_STARTUP_TARGET_MS = 500
+
+# Serve the book list from the catalog entry projection.
+# Fill it with manage.py rebuild_catalog_projection before switching this on.
+CATALOG_LIST_FROM_PROJECTION = False
+
+# Resolve permissions through the shared cache instead of auth_permission joins
+# on every request (see catalog/permissions.py). Sessions record the path of the
+# backend that logged the user in, so switching to this backend logs out every
+# user once; keep 'django.contrib.auth.backends.ModelBackend' listed after it
+# to keep old sessions, at the price of uncached checks for denied permissions.
+AUTHENTICATION_BACKENDS = ['catalog.permissions.CachedModelBackend']
+
+# Availability forecast (catalog/forecast.py, needs NumPy): the daily chance that
+# an overdue copy comes back, halved for every HALF_LIFE days it is overdue.
+CATALOG_FORECAST_OVERDUE_RETURN_RATE = 0.1
+CATALOG_FORECAST_OVERDUE_HALF_LIFE = 30
+# Seconds the staff forecast report is reused for the same start day and horizon.
+CATALOG_FORECAST_CACHE_TIMEOUT = 15 * 60